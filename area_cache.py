@@ -0,0 +1,155 @@
+import os
+import typing
+
+from array import array
+from collections import OrderedDict
+
+
+# Estimated memory the cached occupancy grids may use, in MB; 0 turns the cache off
+AREA_CACHE_MB = float(os.environ.get("AREA_CACHE_MB", "16"))
+# Rough fixed cost of a cache entry beyond its arrays (dict slot, tuple key, list of sizes), in bytes
+AREA_ENTRY_BYTES = 250
+
+
+class AreaCache:
+    """
+    Least recently used cache of the connected free regions of occupancy grids.
+
+    The dict-based search only moves our own snake, and the grid is built from the board's snake list, so
+    every position of one search shares its occupancy grid and only differs in our head. The regions of the
+    grid are labelled once and the area next to any head is then a few lookups; the deeper the search, the
+    more lookups share the labelling. Regions are
+    labelled lazily, the first time a head next to them is asked about, so a miss costs no more than the
+    flood fill it replaces.
+
+    Attributes:
+      max_bytes:
+        Estimated memory the entries may use; the least recently used ones are dropped beyond it.
+      memory:
+        Estimated memory of the entries, in bytes.
+      hits:
+        Number of lookups of a grid that was cached.
+      misses:
+        Number of lookups of a grid that wasn't.
+      evictions:
+        Number of entries dropped to stay under ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: float = AREA_CACHE_MB * 1024 * 1024):
+        """
+        Initializes the AreaCache class.
+
+        Args:
+          max_bytes:
+            Estimated memory the entries may use, in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: typing.OrderedDict[tuple, typing.Tuple[array, list]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        """
+        False if the cache is configured to keep nothing.
+        """
+        return self.max_bytes > 0
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Fraction of the lookups that found their grid cached.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        """
+        Number of grids cached.
+        """
+        return len(self._entries)
+
+    def area(self, size: typing.Tuple[int, int], grid: bytes, adjacent: list, start: typing.Iterable[int]) -> int:
+        """
+        Number of free cells reachable from the given start cells.
+
+        Args:
+          size:
+            The width and height of the board.
+          grid:
+            Per cell, non-zero if it is occupied.
+          adjacent:
+            For every cell, the neighbouring cells that are on the board.
+          start:
+            The cells next to the head; the occupied ones are skipped.
+
+        Returns:
+          The total size of the free regions of the start cells.
+        """
+        key = (size, grid)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            # Label 0 means not labelled yet; region sizes are indexed by label
+            entry = (array("H", bytes(2 * len(grid))), [0])
+            if self.enabled:
+                self._entries[key] = entry
+                self.memory += len(grid) * 3 + AREA_ENTRY_BYTES
+                self._evict()
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+
+        labels, sizes = entry
+        area = 0
+        counted = []
+        for cell in start:
+            if grid[cell]:
+                continue
+            label = labels[cell]
+            if not label:
+                label = self._label(grid, adjacent, labels, sizes, cell)
+            if label not in counted:
+                counted.append(label)
+                area += sizes[label]
+        return area
+
+    @staticmethod
+    def _label(grid: bytes, adjacent: list, labels: array, sizes: list, cell: int) -> int:
+        """
+        Labels the free region of a cell and records its size.
+
+        Returns:
+          The new label.
+        """
+        label = len(sizes)
+        labels[cell] = label
+        stack = [cell]
+        count = 0
+        while stack:
+            current = stack.pop()
+            count += 1
+            for neighbour in adjacent[current]:
+                if not grid[neighbour] and not labels[neighbour]:
+                    labels[neighbour] = label
+                    stack.append(neighbour)
+        sizes.append(count)
+        return label
+
+    def _evict(self):
+        """
+        Drops the least recently used entries while over the memory cap, keeping the newest one.
+        """
+        while self.memory > self.max_bytes and len(self._entries) > 1:
+            (_, grid), _ = self._entries.popitem(last=False)
+            self.memory -= len(grid) * 3 + AREA_ENTRY_BYTES
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Drops every entry; the counters are kept.
+        """
+        self._entries.clear()
+        self.memory = 0
@@ -0,0 +1,54 @@
+"""
+Compares the vectorized area-control kernel with the per-state flood fills.
+
+Run from the repository root:
+  python -m benchmarks.flood_fill [--states 256] [--repeat 5]
+"""
+
+import argparse
+
+import numpy as np
+
+import minimax_a_star
+import minimax_search
+from area_cache import AreaCache
+from board import Board
+from flood_fill import calculate_area_control_batch, occupancy_grid
+from benchmarks.positions import random_game_state
+from benchmarks.timing import best_time
+
+
+def benchmark(size: int, states: int, repeat: int):
+    """
+    Times every flood fill on ``states`` random positions of a ``size`` x ``size`` board and prints a summary.
+    """
+    snakes = 4 if size < 19 else 8
+    game_states = [random_game_state(size, size, snakes=snakes, length=size, seed=seed) for seed in range(states)]
+    boards = [Board.from_game_state(game_state) for game_state in game_states]
+    heads = [board.snakes[board.you].body[0] for board in boards]
+    obstacles = np.stack([occupancy_grid(board) for board in boards])
+
+    # Every implementation must agree before timing them
+    expected = [minimax_search.calculate_area_control(board, head) for board, head in zip(boards, heads)]
+    assert list(calculate_area_control_batch(obstacles, heads)) == expected
+
+    # Without its cache the dict engine would only look the grids up again after the first run
+    minimax_a_star.area_cache = AreaCache(max_bytes=0)
+    dict_time = best_time(lambda: [minimax_a_star.calculate_area_control(game_state, game_state['you']['body'][0])
+                                   for game_state in game_states], repeat)
+    board_time = best_time(lambda: [minimax_search.calculate_area_control(board, head)
+                                    for board, head in zip(boards, heads)], repeat)
+    batch_time = best_time(lambda: calculate_area_control_batch(obstacles, heads), repeat)
+
+    print(f"{size}x{size}, {states} states, {snakes} snakes")
+    for name, elapsed in (("dict flood fill", dict_time), ("board flood fill", board_time), ("batched kernel", batch_time)):
+        print(f"  {name:<18} {elapsed * 1e6 / states:8.1f} us/state  {dict_time / elapsed:6.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--states", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for size in (11, 19):
+        benchmark(size, args.states, args.repeat)
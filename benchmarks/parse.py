@@ -0,0 +1,52 @@
+"""
+Times a /move request from the raw JSON body to the end of the first search iteration.
+
+Run from the repository root:
+  python -m benchmarks.parse [--states 100] [--repeat 5]
+"""
+
+import argparse
+import json
+
+import json_codec
+import minimax_search
+from board import Board
+from benchmarks.positions import random_game_state
+from benchmarks.timing import best_time
+
+
+def first_search(data: bytes):
+    """
+    Everything main.move does before the second iteration: decode, build the board and search one turn deep.
+    """
+    board = Board.from_game_state(json_codec.loads(data))
+    minimax_search.minimax(board, 1)
+
+
+def benchmark(size: int, snakes: int, states: int, repeat: int):
+    """
+    Times every stage on ``states`` random positions of a ``size`` x ``size`` board and prints a summary.
+    """
+    game_states = [random_game_state(size, size, snakes=snakes, length=size, seed=seed) for seed in range(states)]
+    bodies = [json.dumps(game_state).encode() for game_state in game_states]
+
+    stages = [("json.loads", lambda: [json.loads(data) for data in bodies])]
+    if json_codec.orjson is not None:
+        stages.append(("orjson.loads", lambda: [json_codec.orjson.loads(data) for data in bodies]))
+    stages += [
+        ("Board.from_game_state", lambda: [Board.from_game_state(game_state) for game_state in game_states]),
+        ("parse to first search", lambda: [first_search(data) for data in bodies]),
+    ]
+
+    print(f"{size}x{size}, {states} states, {snakes} snakes")
+    for name, function in stages:
+        print(f"  {name:<22} {best_time(function, repeat) * 1e6 / states:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--states", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    benchmark(11, 4, args.states, args.repeat)
+    benchmark(19, 8, args.states, args.repeat)
@@ -0,0 +1,61 @@
+import random
+import typing
+
+
+def random_game_state(width: int = 11, height: int = 11, snakes: int = 2, length: int = 8, food: int = 5,
+                      seed: int = 0) -> typing.Dict:
+    """
+    Generates a random but legal /move game state for benchmarking.
+
+    Snake bodies are random self-avoiding walks; the first snake is ``you``.
+
+    Args:
+      width:
+        Number of columns on the board.
+      height:
+        Number of rows on the board.
+      snakes:
+        Number of snakes on the board.
+      length:
+        Target body length of every snake. Walks that get stuck end up shorter.
+      food:
+        Number of food items.
+      seed:
+        Seed for the random generator.
+
+    Returns:
+      Information about the state space of the game.
+    """
+    rng = random.Random(seed)
+    occupied = set()
+
+    def free_cell() -> tuple:
+        while True:
+            cell = (rng.randrange(width), rng.randrange(height))
+            if cell not in occupied:
+                occupied.add(cell)
+                return cell
+
+    snake_states = []
+    for i in range(snakes):
+        body = [free_cell()]
+        while len(body) < length:
+            x, y = body[-1]
+            options = [(x + dx, y + dy) for dx, dy in ((0, 1), (0, -1), (1, 0), (-1, 0))
+                       if 0 <= x + dx < width and 0 <= y + dy < height and (x + dx, y + dy) not in occupied]
+            if not options:
+                break
+            body.append(rng.choice(options))
+            occupied.add(body[-1])
+        points = [{'x': x, 'y': y} for x, y in body]
+        snake_states.append({'id': f'snake-{i}', 'name': f'snake-{i}', 'health': rng.randint(20, 100),
+                             'body': points, 'head': points[0], 'length': len(points),
+                             'latency': '0', 'shout': ''})
+
+    food_points = [{'x': x, 'y': y} for x, y in (free_cell() for _ in range(food))]
+    return {
+        'game': {'id': f'benchmark-{seed}', 'ruleset': {'name': 'standard', 'version': 'v1.0.0'}, 'timeout': 500},
+        'turn': 50,
+        'board': {'width': width, 'height': height, 'food': food_points, 'hazards': [], 'snakes': snake_states},
+        'you': snake_states[0],
+    }
@@ -0,0 +1,218 @@
+"""
+Replays recorded /move payloads through every move engine offline and compares them.
+
+Run from the repository root:
+  python -m benchmarks.replay [--corpus moves.jsonl ...] [--depth 3] [--save baseline.json]
+  python -m benchmarks.replay --corpus moves.jsonl --baseline baseline.json [--threshold 0.1]
+
+The corpus has one JSON document per line: either a /move body, or a recorded request
+``{"path": "/move", "body": {...}}`` (other paths are skipped). Files ending in .gz, like the ones the
+server records with RECORD_DIR, are decompressed. Without a corpus, random positions are used.
+With a baseline, the run fails if an engine's median latency grew by more than the threshold.
+"""
+
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import random
+import sys
+import time
+import typing
+
+import json_codec
+import mcts
+import minimax_a_star
+import minimax_search
+import simple
+from benchmarks.positions import random_game_state
+from board import Board
+from metrics import percentile
+
+# Playouts of the MCTS engine per unit of --depth
+MCTS_REPLAY_PLAYOUTS = 100
+
+
+def load_corpus(paths: typing.List[str]) -> typing.List[typing.Dict]:
+    """
+    Reads the /move game states of JSONL corpus files.
+
+    Args:
+      paths:
+        The corpus files, plain or gzip-compressed.
+
+    Returns:
+      The game states, in file order.
+    """
+    game_states = []
+    for path in paths:
+        with (gzip.open if path.endswith(".gz") else open)(path, "rb") as corpus:
+            game_states += _read_corpus(corpus)
+    return game_states
+
+
+def _read_corpus(corpus: typing.BinaryIO) -> typing.List[typing.Dict]:
+    """
+    Reads the /move game states of one open corpus file.
+    """
+    game_states = []
+    for line in corpus:
+        if not line.strip():
+            continue
+        record = json_codec.loads(line)
+        if "body" in record:
+            if record.get("path", "/move") != "/move":
+                continue
+            record = record["body"]
+        game_states.append(record)
+    return game_states
+
+
+def run_minimax_search(game_state: typing.Dict, depth: int) -> typing.Tuple[str | None, int]:
+    """
+    Searches with the Board engine to a fixed depth.
+    """
+    stats = minimax_search.SearchStats()
+    _, move = minimax_search.minimax(game_state, depth, stats=stats)
+    return move, stats.nodes
+
+
+def run_minimax_a_star(game_state: typing.Dict, depth: int) -> typing.Tuple[str | None, None]:
+    """
+    Searches with the dict-based engine to a fixed depth; it doesn't count nodes.
+    """
+    _, move = minimax_a_star.minimax(game_state, depth)
+    return move, None
+
+
+def run_mcts(game_state: typing.Dict, depth: int) -> typing.Tuple[str | None, int]:
+    """
+    Runs MCTS for a fixed number of playouts, MCTS_REPLAY_PLAYOUTS per unit of depth; playouts count as nodes.
+    """
+    stats = mcts.PlayoutStats()
+    board = Board.from_game_state(game_state)
+    move = mcts.mcts_search(board, float("inf"), stats=stats, rng=random.Random(game_state.get("turn", 0)),
+                            max_playouts=MCTS_REPLAY_PLAYOUTS * depth)
+    return move, stats.playouts
+
+
+def run_simple(game_state: typing.Dict, depth: int) -> typing.Tuple[str | None, None]:
+    """
+    Picks a random safe move, seeded by the turn so that runs are repeatable.
+    """
+    random.seed(game_state.get("turn", 0))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return simple.move(game_state)["move"], None
+
+
+ENGINES = {
+    "minimax_search": run_minimax_search,
+    "minimax_a_star": run_minimax_a_star,
+    "mcts": run_mcts,
+    "simple": run_simple,
+}
+
+
+def replay(game_states: typing.List[typing.Dict], engines: typing.List[str], depth: int) -> typing.Dict:
+    """
+    Runs every engine on every game state.
+
+    Args:
+      game_states:
+        The positions to replay.
+      engines:
+        Names of the engines in ENGINES.
+      depth:
+        Search depth of the minimax engines.
+
+    Returns:
+      Per engine, its moves, latencies in ms and total nodes (None if it doesn't count them).
+    """
+    results = {}
+    for name in engines:
+        engine = ENGINES[name]
+        moves, latencies, nodes = [], [], 0
+        for game_state in game_states:
+            started = time.perf_counter()
+            move, visited = engine(game_state, depth)
+            latencies.append((time.perf_counter() - started) * 1000)
+            moves.append(move)
+            nodes = None if visited is None or nodes is None else nodes + visited
+        results[name] = {"moves": moves, "latencies": latencies, "nodes": nodes}
+    return results
+
+
+def summarize(results: typing.Dict) -> typing.Dict:
+    """
+    Latency percentiles and nodes per second of every engine.
+    """
+    summary = {}
+    for name, result in results.items():
+        latencies = result["latencies"]
+        seconds = sum(latencies) / 1000
+        summary[name] = {
+            "p50_ms": percentile(latencies, 0.5),
+            "p90_ms": percentile(latencies, 0.9),
+            "p99_ms": percentile(latencies, 0.99),
+            "max_ms": max(latencies),
+            "nodes_per_second": result["nodes"] / seconds if result["nodes"] is not None and seconds else None,
+        }
+    return summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", nargs="+", help="JSONL files of /move bodies or recorded requests, optionally gzipped")
+    parser.add_argument("--states", type=int, default=100, help="random positions to use without a corpus")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument("--depth", type=int, default=3, help="search depth of the minimax engines, in turns")
+    parser.add_argument("--save", help="write the latency summary to this JSON file")
+    parser.add_argument("--baseline", help="latency summary of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed median latency growth, e.g. 0.1 for 10%%")
+    args = parser.parse_args()
+
+    if args.corpus:
+        game_states = load_corpus(args.corpus)
+    else:
+        game_states = [random_game_state(11, 11, snakes=4, length=6, seed=seed) for seed in range(args.states)]
+    results = replay(game_states, args.engines, args.depth)
+    summary = summarize(results)
+
+    print(f"{len(game_states)} positions, depth {args.depth}")
+    for name, row in summary.items():
+        nodes_per_second = f"{row['nodes_per_second']:9.0f}" if row["nodes_per_second"] is not None else "        -"
+        print(f"  {name:<15} p50 {row['p50_ms']:8.2f} ms  p90 {row['p90_ms']:8.2f} ms  p99 {row['p99_ms']:8.2f} ms  "
+              f"max {row['max_ms']:8.2f} ms  {nodes_per_second} nodes/s")
+
+    if "minimax_a_star" in results:
+        cache = minimax_a_star.area_cache
+        print(f"  minimax_a_star area cache: {cache.hit_rate:.0%} hits, {len(cache)} grids, "
+              f"{cache.memory / 1024:.0f} KiB, {cache.evictions} evictions")
+
+    print("move agreement")
+    for i, first in enumerate(args.engines):
+        for second in args.engines[i + 1:]:
+            agreed = sum(a == b for a, b in zip(results[first]["moves"], results[second]["moves"]))
+            print(f"  {first} / {second}: {agreed / len(game_states):.0%}")
+
+    if args.save:
+        with open(args.save, "w") as output:
+            json.dump(summary, output, indent=2)
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        for name, row in summary.items():
+            if name not in baseline:
+                continue
+            limit = baseline[name]["p50_ms"] * (1 + args.threshold)
+            if row["p50_ms"] > limit:
+                print(f"REGRESSION {name}: p50 {row['p50_ms']:.2f} ms > {limit:.2f} ms allowed")
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,14 @@
+import time
+import typing
+
+
+def best_time(function: typing.Callable, repeat: int) -> float:
+    """
+    Runs a function several times and returns the fastest run in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
@@ -0,0 +1,410 @@
+import typing
+
+from collections import deque
+
+from geometry import MOVES, MOVE_DELTAS, geometry
+from transposition import zobrist_keys
+
+
+MOVE_INDEX = {move: i for i, move in enumerate(MOVES)}
+
+# Health of a snake that has just eaten
+MAX_HEALTH = 100
+# Move the rules apply for a snake that didn't send one
+DEFAULT_MOVE = 'up'
+
+
+class Snake:
+    """
+    Compact record of a single snake on the board.
+
+    Attributes:
+      id:
+        The snake id from the game state.
+      name:
+        The snake name from the game state.
+      health:
+        The remaining health of the snake.
+      body:
+        A deque of flat cell indices, head first.
+      extra:
+        Any other fields of the snake in the game state, kept as-is for the conversion back to JSON.
+      alive:
+        False once the snake has been eliminated. Its body is kept so the elimination can be unmade.
+    """
+    __slots__ = ('id', 'name', 'health', 'body', 'extra', 'alive')
+
+    def __init__(self, snake_id: str, name: str, health: int, body: deque, extra: dict):
+        """
+        Initializes the Snake class.
+        """
+        self.id = snake_id
+        self.name = name
+        self.health = health
+        self.body = body
+        self.extra = extra
+        self.alive = True
+
+
+class Board:
+    """
+    Flat-array representation of a game state, built once per request from the /move JSON.
+
+    Cells are addressed by a flat index ``y * width + x``. The occupancy grid counts how many
+    body segments sit on each cell so that stacked segments (e.g. on the first turn) are handled.
+
+    Attributes:
+      width:
+        Number of columns on the board.
+      height:
+        Number of rows on the board.
+      cells:
+        Occupancy count of every cell.
+      geometry:
+        The tables of the board size, shared by every board of that size.
+      neighbours:
+        For every cell, the cell reached by each move in MOVES order, or -1 if that move leaves the board.
+      adjacent:
+        For every cell, the neighbouring cells that are on the board.
+      food:
+        Set of cells containing food.
+      hazards:
+        List of hazard cells.
+      snakes:
+        List of Snake records.
+      you:
+        Index of our snake in ``snakes``.
+      game:
+        The ``game`` object of the game state.
+      turn:
+        The turn number of the game state.
+      key:
+        Zobrist key of the position, kept up to date by make_move and unmake_move.
+    """
+    __slots__ = ('width', 'height', 'cells', 'geometry', 'neighbours', 'adjacent', 'food', 'hazards', 'snakes', 'you',
+                 'game', 'turn', 'key', '_keys', '_history')
+
+    def __init__(self, width: int, height: int):
+        """
+        Initializes an empty board.
+
+        Args:
+          width:
+            Number of columns on the board.
+          height:
+            Number of rows on the board.
+        """
+        self.width = width
+        self.height = height
+        self.cells = bytearray(width * height)
+        # The neighbour tables only depend on the board size, so every board of that size shares them
+        self.geometry = geometry(width, height)
+        self.neighbours = self.geometry.neighbours
+        self.adjacent = self.geometry.adjacent
+        self.food = set()
+        self.hazards = []
+        self.snakes = []
+        self.you = 0
+        self.game = {}
+        self.turn = 0
+        self.key = 0
+        self._keys = zobrist_keys(width * height, 0)
+        self._history = []
+
+    @classmethod
+    def from_game_state(cls, game_state: typing.Dict) -> 'Board':
+        """
+        Builds a board from the game state sent with /move.
+
+        Args:
+          game_state:
+            Information about the state space of the game.
+
+        Returns:
+          The board representation of the game state.
+        """
+        board_state = game_state['board']
+        board = cls(board_state['width'], board_state['height'])
+        board.game = game_state.get('game', {})
+        board.turn = game_state.get('turn', 0)
+        board.food = {board.index(point) for point in board_state['food']}
+        board.hazards = [board.index(point) for point in board_state.get('hazards', [])]
+
+        you_id = game_state['you']['id']
+        snakes = board_state['snakes']
+        if not any(snake['id'] == you_id for snake in snakes):
+            snakes = snakes + [game_state['you']]
+        for snake in snakes:
+            body = deque(board.index(segment) for segment in snake['body'])
+            for cell in body:
+                board.cells[cell] += 1
+            if snake['id'] == you_id:
+                board.you = len(board.snakes)
+            extra = {key: value for key, value in snake.items()
+                     if key not in ('id', 'name', 'health', 'body', 'head', 'length')}
+            board.snakes.append(Snake(snake['id'], snake.get('name', ''), snake['health'], body, extra))
+        board.rehash()
+        return board
+
+    def rehash(self):
+        """
+        Recomputes the Zobrist key of the position from scratch.
+        """
+        keys = self._keys = zobrist_keys(self.width * self.height, len(self.snakes))
+        # Our slot is part of the key, so searches for different snakes of one game don't share entries
+        key = keys.you[self.you] if self.snakes else 0
+        for cell in self.food:
+            key ^= keys.food[cell]
+        for slot, snake in enumerate(self.snakes):
+            if not snake.alive:
+                key ^= keys.eliminated[slot]
+                continue
+            key ^= keys.head[slot][snake.body[0]]
+            segment = keys.segment[slot]
+            for cell in snake.body:
+                key ^= segment[cell]
+        self.key = key
+
+    def to_game_state(self) -> typing.Dict:
+        """
+        Converts the board back into the JSON shape of the game state.
+
+        Returns:
+          Information about the state space of the game.
+        """
+        snakes = [self._snake_state(snake) for snake in self.snakes if snake.alive]
+        return {
+            'game': self.game,
+            'turn': self.turn,
+            'board': {
+                'width': self.width,
+                'height': self.height,
+                'food': [self.point(cell) for cell in sorted(self.food)],
+                'hazards': [self.point(cell) for cell in self.hazards],
+                'snakes': snakes,
+            },
+            'you': self._snake_state(self.snakes[self.you]),
+        }
+
+    def _snake_state(self, snake: Snake) -> typing.Dict:
+        """
+        Converts a snake record back into the JSON shape.
+
+        Args:
+          snake:
+            The snake record to convert.
+
+        Returns:
+          The snake in the game state format.
+        """
+        body = [self.point(cell) for cell in snake.body]
+        state = {'id': snake.id, 'name': snake.name, 'health': snake.health,
+                 'body': body, 'head': body[0], 'length': len(body)}
+        state.update(snake.extra)
+        return state
+
+    def index(self, point: dict) -> int:
+        """
+        Converts a point to its flat cell index.
+
+        Args:
+          point:
+            The position of the point.
+
+        Returns:
+          The flat cell index.
+        """
+        return point['y'] * self.width + point['x']
+
+    def point(self, cell: int) -> dict:
+        """
+        Converts a flat cell index to a point.
+
+        Args:
+          cell:
+            The flat cell index.
+
+        Returns:
+          The position of the cell.
+        """
+        return {'x': cell % self.width, 'y': cell // self.width}
+
+    def is_occupied(self, cell: int) -> bool:
+        """
+        Checks if a cell is occupied by any snake segment.
+
+        Args:
+          cell:
+            The flat cell index.
+
+        Returns:
+          True if a snake segment sits on the cell.
+        """
+        return self.cells[cell] != 0
+
+    def is_terminal(self) -> bool:
+        """
+        Determines if the board is a terminal state.
+
+        Returns:
+          True if our snake has been eliminated or its health is zero.
+        """
+        you = self.snakes[self.you]
+        return not you.alive or you.health == 0
+
+    def make_move(self, moves: typing.Sequence[str | None]):
+        """
+        Advances the game one turn in place following the standard Battlesnake rules: every snake moves,
+        loses one health, eats and grows. Snakes that left the board or starved are then taken off, and only
+        after that are the others eliminated for running into a body or losing a head-to-head collision.
+
+        Args:
+          moves:
+            The move of every snake, indexed like ``snakes``. Eliminated snakes are skipped; a snake
+            without a move goes DEFAULT_MOVE.
+        """
+        cells = self.cells
+        neighbours = self.neighbours
+        snakes = self.snakes
+        keys = self._keys
+        key_before = self.key
+        key = key_before
+
+        # Move every snake: the head advances and the tail is dropped
+        moved = []
+        eliminated = []
+        for slot, snake in enumerate(snakes):
+            if not snake.alive:
+                continue
+            body = snake.body
+            neck = body[0]
+            head = neighbours[neck][MOVE_INDEX[moves[slot] or DEFAULT_MOVE]]
+            if head < 0:
+                eliminated.append(slot)  # Out of bounds, the body stays where it was
+                continue
+            body.appendleft(head)
+            cells[head] += 1
+            tail = body.pop()
+            cells[tail] -= 1
+            heads = keys.head[slot]
+            segment = keys.segment[slot]
+            key ^= heads[neck] ^ heads[head] ^ segment[head] ^ segment[tail]
+            moved.append((slot, snake.health, tail))
+            snake.health -= 1
+
+        # Snakes on food eat it, restoring their health and growing by their tail
+        eaten = []
+        food = self.food
+        for slot, _, _ in moved:
+            snake = snakes[slot]
+            head = snake.body[0]
+            if head in food:
+                snake.health = MAX_HEALTH
+                tail = snake.body[-1]
+                snake.body.append(tail)
+                cells[tail] += 1
+                key ^= keys.segment[slot][tail]
+                if head not in eaten:
+                    eaten.append(head)
+        for cell in eaten:
+            food.discard(cell)
+            key ^= keys.food[cell]
+
+        # Snakes that left the board or starved are taken off first, so that nobody collides with them
+        for slot, _, _ in moved:
+            if snakes[slot].health <= 0:
+                eliminated.append(slot)
+        key = self._remove_snakes(eliminated, key)
+
+        # Decide collisions among the remaining snakes, after every one of them has moved and eaten
+        collided = []
+        for slot, _, _ in moved:
+            snake = snakes[slot]
+            if not snake.alive:
+                continue
+            head = snake.body[0]
+            rivals = [snakes[other] for other, _, _ in moved
+                      if other != slot and snakes[other].alive and snakes[other].body[0] == head]
+            if cells[head] > len(rivals) + 1:
+                collided.append(slot)  # Ran into a body segment
+            elif any(len(rival.body) >= len(snake.body) for rival in rivals):
+                collided.append(slot)  # Lost or drew a head-to-head collision
+        key = self._remove_snakes(collided, key)
+        eliminated += collided
+
+        self.key = key
+        self.turn += 1
+        self._history.append((key_before, moved, eaten, eliminated))
+
+    def _remove_snakes(self, slots: typing.List[int], key: int) -> int:
+        """
+        Takes eliminated snakes off the board.
+
+        Args:
+          slots:
+            The slots of the snakes to eliminate.
+          key:
+            The Zobrist key of the position so far.
+
+        Returns:
+          The key without the snakes.
+        """
+        cells = self.cells
+        keys = self._keys
+        for slot in slots:
+            snake = self.snakes[slot]
+            snake.alive = False
+            segment = keys.segment[slot]
+            key ^= keys.eliminated[slot] ^ keys.head[slot][snake.body[0]]
+            for cell in snake.body:
+                cells[cell] -= 1
+                key ^= segment[cell]
+        return key
+
+    def unmake_move(self):
+        """
+        Reverts the last turn made with ``make_move``.
+        """
+        key_before, moved, eaten, eliminated = self._history.pop()
+        cells = self.cells
+        snakes = self.snakes
+
+        for slot in eliminated:
+            snake = snakes[slot]
+            snake.alive = True
+            for cell in snake.body:
+                cells[cell] += 1
+
+        for cell in eaten:
+            self.food.add(cell)
+
+        for slot, health, tail in moved:
+            snake = snakes[slot]
+            body = snake.body
+            snake.health = health
+            if body[0] in eaten:
+                cells[body.pop()] -= 1  # Undo the growth
+            cells[body.popleft()] -= 1
+            body.append(tail)
+            cells[tail] += 1
+
+        self.key = key_before
+        self.turn -= 1
+
+    @property
+    def ply(self) -> int:
+        """
+        Number of moves made on the board that have not been unmade.
+        """
+        return len(self._history)
+
+    def rewind(self, ply: int):
+        """
+        Unmakes moves until the board is back at the given ply, e.g. after an aborted search.
+
+        Args:
+          ply:
+            The ply to return to.
+        """
+        while len(self._history) > ply:
+            self.unmake_move()
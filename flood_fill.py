@@ -0,0 +1,144 @@
+import typing
+
+import numpy as np
+
+from board import Board
+
+
+def occupancy_grid(board: Board) -> np.ndarray:
+    """
+    Copies the occupancy of a board into a boolean grid.
+
+    Args:
+      board:
+        The board representation of the game state.
+
+    Returns:
+      A (height, width) array that is True where a snake segment sits.
+    """
+    return np.frombuffer(board.cells, dtype=np.uint8).reshape(board.height, board.width) != 0
+
+
+def calculate_area_control_batch(obstacles: np.ndarray, heads: typing.Sequence[int]) -> np.ndarray:
+    """
+    Vectorized flood fill: counts the free cells reachable from each head for a whole batch of states at once.
+
+    Reachability grows by one step per iteration for every state together (a boolean dilation masked by
+    the obstacles) until no state changes. The grids are padded with a border of obstacles and flattened
+    so that a step in each direction is a single shifted slice. The result matches
+    ``minimax_search.calculate_area_control``.
+
+    Args:
+      obstacles:
+        A (states, height, width) boolean array that is True for occupied cells.
+      heads:
+        The flat head cell (``y * width + x``) of every state.
+
+    Returns:
+      Number of squares controlled from each head, as a (states,) array.
+    """
+    states, height, width = obstacles.shape
+    stride = width + 2
+    free = np.zeros((states, height + 2, stride), dtype=bool)
+    free[:, 1:-1, 1:-1] = ~obstacles
+    free = free.reshape(states, -1)
+
+    heads = np.asarray(heads)
+    reached = np.zeros_like(free)
+    reached[np.arange(states), (heads // width + 1) * stride + heads % width + 1] = True
+
+    # Rows 1..height of the padded grids; a step up or down is a shift by a whole row
+    inner = slice(stride, -stride)
+    enterable = free[:, inner]
+    count = 0
+    while True:
+        # Cells next to a reached cell, in every direction; the padding keeps rows from wrapping
+        grown = reached[:, :-2 * stride] | reached[:, 2 * stride:]
+        grown |= reached[:, stride - 1:-stride - 1]
+        grown |= reached[:, stride + 1:-stride + 1]
+        # Only free cells can be entered; the heads themselves stay as seeds
+        grown &= enterable
+        grown |= reached[:, inner]
+        grown_count = np.count_nonzero(grown)
+        if grown_count == count:
+            break
+        count = grown_count
+        reached[:, inner] = grown
+
+    return np.count_nonzero(reached & free, axis=1)
+
+
+def calculate_area_control_boards(boards: typing.Sequence[Board]) -> np.ndarray:
+    """
+    Scores the area control of our snake on many boards in one call.
+
+    Args:
+      boards:
+        Boards of the same size.
+
+    Returns:
+      Number of squares controlled by our snake on each board.
+    """
+    obstacles = np.stack([occupancy_grid(board) for board in boards])
+    heads = [board.snakes[board.you].body[0] for board in boards]
+    return calculate_area_control_batch(obstacles, heads)
+
+
+def nearest_food_batch(free_at: np.ndarray, heads: typing.Sequence[int], food: np.ndarray) -> np.ndarray:
+    """
+    Vectorized breadth-first search: the number of moves from each head to its nearest food, for a batch of states.
+
+    Every state advances its search frontier by one move per iteration. Body segments are timed like in
+    ``food_search.search_food``: a cell can be entered on the move its last segment has moved off it. The
+    result matches ``food_search.search_food(...).nearest_distance``.
+
+    Args:
+      free_at:
+        A (states, height, width) integer array with the number of moves after which every cell is free.
+      heads:
+        The flat head cell (``y * width + x``) of every state.
+      food:
+        A (states, height, width) boolean array that is True for cells with food.
+
+    Returns:
+      The distance to the nearest food of each state, or -1 if it cannot reach any, as a (states,) array.
+    """
+    states, height, width = free_at.shape
+    stride = width + 2
+    # Padding cells are never free
+    timing = np.full((states, height + 2, stride), np.iinfo(np.int32).max, dtype=np.int32)
+    timing[:, 1:-1, 1:-1] = free_at
+    timing = timing.reshape(states, -1)
+    targets = np.zeros((states, height + 2, stride), dtype=bool)
+    targets[:, 1:-1, 1:-1] = food
+    targets = targets.reshape(states, -1)
+
+    heads = np.asarray(heads)
+    seeds = (np.arange(states), (heads // width + 1) * stride + heads % width + 1)
+    targets[seeds] = False  # Food under the head doesn't count
+    reached = np.zeros_like(targets)
+    reached[seeds] = True
+    frontier = reached.copy()
+    distances = np.full(states, -1)
+    searching = targets.any(axis=1)
+
+    grown = np.empty_like(frontier)
+    layer = 0
+    while searching.any():
+        layer += 1
+        # Cells next to the frontier that are free by this move and not reached yet
+        grown[:] = False
+        grown[:, stride:] |= frontier[:, :-stride]
+        grown[:, :-stride] |= frontier[:, stride:]
+        grown[:, 1:] |= frontier[:, :-1]
+        grown[:, :-1] |= frontier[:, 1:]
+        grown &= timing <= layer
+        grown &= ~reached
+        grown[~searching] = False
+        reached |= grown
+        found = searching & (grown & targets).any(axis=1)
+        distances[found] = layer
+        searching &= ~found & grown.any(axis=1)
+        frontier, grown = grown, frontier
+
+    return distances
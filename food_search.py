@@ -0,0 +1,174 @@
+import typing
+
+from board import Board, MOVES
+from geometry import geometry
+
+
+class FoodPaths:
+    """
+    Distances and first moves from one head to every piece of food it can reach.
+
+    Attributes:
+      distances:
+        Per food cell, the number of moves needed to reach it.
+      moves:
+        Per food cell, the first move of a shortest path to it.
+    """
+    __slots__ = ('distances', 'moves')
+
+    def __init__(self, distances: typing.Dict[int, int], moves: typing.Dict[int, str]):
+        """
+        Initializes the FoodPaths class.
+        """
+        self.distances = distances
+        self.moves = moves
+
+    @property
+    def nearest_distance(self) -> int | None:
+        """
+        Number of moves to the closest reachable food, or None if no food can be reached.
+        """
+        return min(self.distances.values()) if self.distances else None
+
+
+def search_food(neighbours: list, free_at: list, head: int, food: typing.Iterable[int]) -> FoodPaths:
+    """
+    Breadth-first search from a head that stops once every piece of food has been reached.
+
+    Body segments are timed: a cell can be entered on the move its last segment has moved off it, so
+    paths can follow a tail instead of going around it.
+
+    Args:
+      neighbours:
+        For every cell, the cell reached by each move in MOVES order, or -1 if that move leaves the board.
+      free_at:
+        For every cell, the number of moves after which it is free (0 for empty cells).
+      head:
+        The cell to search from.
+      food:
+        Cells containing food.
+
+    Returns:
+      The distance and first move to every reachable piece of food.
+    """
+    remaining = set(food)
+    remaining.discard(head)
+    distances = {}
+    moves = {}
+    if not remaining:
+        return FoodPaths(distances, moves)
+
+    # First move of the path to every reached cell, as an index into MOVES
+    first = {head: -1}
+    frontier = [head]
+    layer = 0
+    while frontier and remaining:
+        layer += 1
+        next_frontier = []
+        for cell in frontier:
+            direction = first[cell]
+            for move, neighbour in enumerate(neighbours[cell]):
+                if neighbour < 0 or neighbour in first or free_at[neighbour] > layer:
+                    continue
+                first[neighbour] = move if direction < 0 else direction
+                next_frontier.append(neighbour)
+                if neighbour in remaining:
+                    remaining.discard(neighbour)
+                    distances[neighbour] = layer
+                    moves[neighbour] = MOVES[first[neighbour]]
+        frontier = next_frontier
+
+    return FoodPaths(distances, moves)
+
+
+def _board_free_at(board: Board) -> list:
+    """
+    Number of moves after which every cell of a board is free, from the snake bodies.
+
+    Args:
+      board:
+        The board representation of the game state.
+
+    Returns:
+      Per cell, the number of moves until the last segment on it has moved off.
+    """
+    free_at = [0] * (board.width * board.height)
+    for snake in board.snakes:
+        if not snake.alive:
+            continue
+        length = len(snake.body)
+        # Segment k of a body of length n has moved off its cell after n - k moves
+        for k, cell in enumerate(snake.body):
+            if free_at[cell] < length - k:
+                free_at[cell] = length - k
+    return free_at
+
+
+def find_food(board: Board, snake_index: int | None = None) -> FoodPaths:
+    """
+    Finds the distance and first move to every piece of food with one search.
+
+    Args:
+      board:
+        The board representation of the game state.
+      snake_index:
+        The snake to search from, our snake by default.
+
+    Returns:
+      The food paths of that snake.
+    """
+    if snake_index is None:
+        snake_index = board.you
+    return search_food(board.neighbours, _board_free_at(board), board.snakes[snake_index].body[0], board.food)
+
+
+def find_food_for_all(board: Board) -> typing.List[FoodPaths | None]:
+    """
+    Finds the food paths of every snake, sharing the body timing between the searches.
+
+    Args:
+      board:
+        The board representation of the game state.
+
+    Returns:
+      Per snake index, its food paths, or None if the snake has been eliminated.
+    """
+    free_at = _board_free_at(board)
+    return [search_food(board.neighbours, free_at, snake.body[0], board.food) if snake.alive else None
+            for snake in board.snakes]
+
+
+def find_food_in_state(game_state: typing.Dict) -> FoodPaths:
+    """
+    Finds the distance and first move from our head to every piece of food of a dict game state.
+
+    Our snake is read from ``you`` so that states produced by a dict-based ``apply_move`` are searched
+    from the right head.
+
+    Args:
+      game_state:
+        Information about the state space of the game.
+
+    Returns:
+      Our food paths.
+    """
+    width = game_state['board']['width']
+    height = game_state['board']['height']
+    neighbours = geometry(width, height).neighbours
+
+    you = game_state['you']
+    snakes = [snake for snake in game_state['board']['snakes'] if snake['id'] != you['id']] + [you]
+    free_at = [0] * (width * height)
+    for snake in snakes:
+        body = snake['body']
+        for k, part in enumerate(body):
+            if 0 <= part['x'] < width and 0 <= part['y'] < height:
+                cell = part['y'] * width + part['x']
+                if free_at[cell] < len(body) - k:
+                    free_at[cell] = len(body) - k
+
+    head = you['body'][0]
+    if not (0 <= head['x'] < width and 0 <= head['y'] < height):
+        return FoodPaths({}, {})
+    food = [point['y'] * width + point['x'] for point in game_state['board']['food']]
+    return search_food(neighbours, free_at, head['y'] * width + head['x'], food)
@@ -0,0 +1,109 @@
+import typing
+
+
+# Move names in the order the search explores them, with their (dx, dy) offsets
+MOVES = ('up', 'down', 'left', 'right')
+MOVE_DELTAS = {'up': (0, 1), 'down': (0, -1), 'left': (-1, 0), 'right': (1, 0)}
+
+
+class Geometry:
+    """
+    Lookup tables that only depend on the size of a board, built once per size and shared by every board,
+    search and game state of that size.
+
+    Cells are addressed by a flat index ``y * width + x``.
+
+    Attributes:
+      width:
+        Number of columns on the board.
+      height:
+        Number of rows on the board.
+      neighbours:
+        For every cell, the cell reached by each move in MOVES order, or -1 if that move leaves the board.
+      adjacent:
+        For every cell, the neighbouring cells that are on the board.
+      distance:
+        For every cell, the Manhattan distance to every other cell, as a row of bytes.
+      edges:
+        1 for the cells along the walls, 0 for the others.
+      all_cells:
+        Bitboard with the bit of every cell set; bit ``i`` is cell ``i``.
+      not_first_column:
+        Bitboard of the cells with x > 0, where a shift to the right may land.
+      not_last_column:
+        Bitboard of the cells with x < width - 1, where a shift to the left may land.
+    """
+    __slots__ = ('width', 'height', 'neighbours', 'adjacent', 'distance', 'edges', 'all_cells', 'not_first_column',
+                 'not_last_column')
+
+    def __init__(self, width: int, height: int):
+        """
+        Builds the tables of a board size.
+
+        Args:
+          width:
+            Number of columns on the board.
+          height:
+            Number of rows on the board.
+        """
+        self.width = width
+        self.height = height
+        self.neighbours = [self._point_neighbours(cell % width, cell // width) for cell in range(width * height)]
+        self.adjacent = [tuple(cell for cell in cells if cell >= 0) for cells in self.neighbours]
+        # Distances on boards over 255 cells across don't fit in a byte; such boards get lists instead
+        row = bytes if width + height <= 256 else list
+        self.distance = [row(abs(x - x0) + abs(y - y0) for y in range(height) for x in range(width))
+                         for y0 in range(height) for x0 in range(width)]
+        self.edges = bytearray(x in (0, width - 1) or y in (0, height - 1) for y in range(height) for x in range(width))
+        self.all_cells = (1 << (width * height)) - 1
+        first_column = sum(1 << (y * width) for y in range(height))
+        self.not_first_column = self.all_cells & ~first_column
+        self.not_last_column = self.all_cells & ~(first_column << (width - 1))
+
+    def _point_neighbours(self, x: int, y: int) -> typing.Tuple[int, ...]:
+        """
+        The cell reached from a point by each move in MOVES order, or -1 if that move leaves the board.
+        """
+        width, height = self.width, self.height
+        return tuple((y + dy) * width + x + dx if 0 <= x + dx < width and 0 <= y + dy < height else -1
+                     for dx, dy in (MOVE_DELTAS[move] for move in MOVES))
+
+    def neighbours_of(self, point: dict) -> typing.Tuple[int, ...]:
+        """
+        The cell reached from a point of a game state by each move in MOVES order, or -1 if that move leaves the
+        board. Points off the board, which a simulated move may produce, are handled too.
+
+        Args:
+          point:
+            The position of the point.
+
+        Returns:
+          The neighbouring cells.
+        """
+        x, y = point['x'], point['y']
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.neighbours[y * self.width + x]
+        return self._point_neighbours(x, y)
+
+
+# Tables of every board size seen by the process
+_geometries: typing.Dict[typing.Tuple[int, int], Geometry] = {}
+
+
+def geometry(width: int, height: int) -> Geometry:
+    """
+    Gets the tables of a board size, building them on first use.
+
+    Args:
+      width:
+        Number of columns on the board.
+      height:
+        Number of rows on the board.
+
+    Returns:
+      The shared tables of that size.
+    """
+    tables = _geometries.get((width, height))
+    if tables is None:
+        tables = _geometries[(width, height)] = Geometry(width, height)
+    return tables
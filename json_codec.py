@@ -0,0 +1,40 @@
+import json
+import typing
+
+# orjson decodes several times faster than the standard library; it is optional and used when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: bytes | str) -> typing.Any:
+    """
+    Decodes a JSON document, with orjson if it is installed.
+
+    Args:
+      data:
+        The JSON document.
+
+    Returns:
+      The decoded value.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value: typing.Any) -> bytes:
+    """
+    Encodes a value as compact JSON, with orjson if it is installed.
+
+    Args:
+      value:
+        The value to encode.
+
+    Returns:
+      The UTF-8 encoded JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode()
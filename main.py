@@ -10,10 +10,38 @@
 # To get you started we've included code to prevent your Battlesnake from moving backwards.
 # For more info see docs.battlesnake.com
 
+import os
+import time
 import typing
 import sys
 
-from minimax_search import minimax
+from board import Board
+from mcts import mcts_search, PlayoutStats
+from metrics import METRICS
+from minimax_search import get_safe_moves, iterative_deepening, principal_variation, SearchStats
+from parallel_search import parallel_search, SEARCH_WORKERS
+from pondering import stop_pondering
+from profiling import MoveProfiler
+from sessions import Session, SessionStore, session_key
+
+# Time the search may use is the game timeout minus this margin (in ms), left for network latency
+MOVE_TIMEOUT_MARGIN_MS = int(os.environ.get("MOVE_TIMEOUT_MARGIN_MS", "150"))
+# Game timeout (in ms) assumed when the game state doesn't carry one
+DEFAULT_MOVE_TIMEOUT_MS = 500
+
+# Move engine (ENGINE or --engine): alpha-beta minimax, or Monte Carlo tree search for boards with many snakes
+MINIMAX = "minimax"
+MCTS = "mcts"
+ENGINE = os.environ.get("ENGINE", MINIMAX)
+
+# Keep searching the predicted next position after answering (PONDER=1 or --ponder), for at most this long (in ms)
+PONDER = os.environ.get("PONDER", "0") == "1"
+PONDER_TIMEOUT_MS = int(os.environ.get("PONDER_TIMEOUT_MS", "1000"))
+
+# Search state of every game in progress, so each turn continues from the work of the previous one
+sessions = SessionStore()
+# Saves a cProfile of the search of sampled moves (PROFILE_EVERY) and of /move?profile=1 requests
+profiler = MoveProfiler()
 
 # info is called when you create your Battlesnake on play.battlesnake.com
 # and controls your Battlesnake's appearance
@@ -32,17 +60,117 @@ def info() -> typing.Dict:
 
 # start is called when your Battlesnake begins a game
 def start(game_state: typing.Dict):
+    sessions.get(session_key(game_state))
     print("GAME START")
 
 
 # end is called when your Battlesnake finishes a game
 def end(game_state: typing.Dict):
+    session = sessions.end(session_key(game_state))
+    if session is not None:
+        session.ponderer.stop()
     print("GAME OVER\n")
 
 
+def move_time_budget(game_state: typing.Dict) -> float:
+    """
+    Seconds the search may spend on this move: the game timeout minus a safety margin, and minus the time
+    since the server received the request (``received_at``), e.g. while it waited for a busy worker.
+    """
+    timeout = game_state.get("game", {}).get("timeout", DEFAULT_MOVE_TIMEOUT_MS)
+    budget = max(timeout - MOVE_TIMEOUT_MARGIN_MS, 0) / 1000.0
+    received = game_state.get("received_at")
+    if received is not None:
+        budget -= time.time() - received
+    return max(budget, 0.0)
+
+
 def move(game_state: typing.Dict) -> typing.Dict:
-    _, next_move = minimax(game_state, depth=3) # Adjust the depth accordingly
-    return {"move": next_move or "down"} # Fallback to "down" if no move is found
+    started = time.perf_counter()
+    # Pondering of every game in the process gives way to the move that must be answered
+    stop_pondering()
+    deadline = started + move_time_budget(game_state)
+    board = Board.from_game_state(game_state)
+    parsed = time.perf_counter()
+    # Reuse the tables of the last turn: positions of the subtree the opponents' moves led to are already stored
+    session = sessions.get(session_key(game_state))
+    if session.predicted_key == board.key:
+        session.pv_hits += 1
+    if ENGINE == MCTS:
+        return mcts_move(game_state, board, session, deadline, started, parsed)
+    # Pondering stops before the table is searched again; if it guessed right its results are in the table
+    pondered_depth = session.ponderer.depth if session.ponderer.stop() == board.key else None
+    stats = SearchStats(timed=METRICS)
+    hits, misses = session.table.hits, session.table.misses
+    with profiler.profile(game_state) as profile_path:
+        if SEARCH_WORKERS > 1:
+            # Root moves are searched in worker processes (SEARCH_WORKERS or --search-workers), with tables of their own
+            _, next_move, depth = parallel_search(game_state, deadline, SEARCH_WORKERS, stats=stats)
+        else:
+            _, next_move, depth = iterative_deepening(board, deadline, table=session.table, orderer=session.orderer, stats=stats)
+            session.remember(board, principal_variation(board, session.table, depth))
+            if PONDER and session.pv:
+                session.ponderer.start(board, session.pv[0], session.table, time.perf_counter() + PONDER_TIMEOUT_MS / 1000.0)
+    searched = time.perf_counter()
+
+    print(f"MOVE {game_state['turn']}: {next_move} (depth {depth}, {stats.nodes} nodes, "
+          f"{stats.cutoffs} cutoffs, branching factor {stats.branching_factor:.2f}, "
+          f"TT hit rate {session.table.hit_rate:.2f}, {session.pv_hits} predicted turns"
+          + (f", pondered to depth {pondered_depth}" if pondered_depth is not None else "")
+          + (f", profiled to {profile_path}" if profile_path is not None else "") + ")")
+    response = {"move": next_move or "down"} # Fallback to "down" if no move is found
+    if METRICS:
+        # Handed to the server, which keeps the histograms for /metrics and removes it from the response
+        probes = session.table.hits + session.table.misses - hits - misses
+        response["metrics"] = {
+            "game_id": game_state.get("game", {}).get("id"),
+            "turn": game_state.get("turn"),
+            "move": next_move,
+            "parse_ms": (parsed - started) * 1000,
+            "search_ms": (searched - parsed) * 1000,
+            "eval_ms": stats.eval_time * 1000,
+            "evaluations": stats.evaluations,
+            "nodes": stats.nodes,
+            "nodes_per_second": stats.nodes / (searched - parsed) if searched > parsed else 0.0,
+            "depth": depth,
+            "tt_hit_rate": (session.table.hits - hits) / probes if probes else None,
+            "cutoffs": stats.cutoffs,
+        }
+    return response
+
+
+def fallback_move(game_state: typing.Dict) -> typing.Dict:
+    """
+    Answers a move without searching, with the first safe move; the server uses it when a worker dies.
+    """
+    safe_moves = get_safe_moves(Board.from_game_state(game_state))
+    return {"move": safe_moves[0] if safe_moves else "down"}
+
+
+def mcts_move(game_state: typing.Dict, board: Board, session: Session, deadline: float, started: float, parsed: float) -> typing.Dict:
+    """
+    Answers a move with the MCTS engine, continuing the game's tree from the last turn.
+    """
+    stats = PlayoutStats()
+    with profiler.profile(game_state) as profile_path:
+        next_move = mcts_search(board, deadline, tree=session.tree, stats=stats)
+    searched = time.perf_counter()
+
+    print(f"MOVE {game_state['turn']}: {next_move} (MCTS, {stats.playouts} playouts, "
+          f"{stats.playouts_per_second:.0f} playouts/s, {stats.reused} reused, {session.tree.size} nodes"
+          + (f", profiled to {profile_path}" if profile_path is not None else "") + ")")
+    response = {"move": next_move or "down"}
+    if METRICS:
+        response["metrics"] = {
+            "game_id": game_state.get("game", {}).get("id"),
+            "turn": game_state.get("turn"),
+            "move": next_move,
+            "parse_ms": (parsed - started) * 1000,
+            "search_ms": (searched - parsed) * 1000,
+            "playouts": stats.playouts,
+            "playouts_per_second": stats.playouts_per_second,
+        }
+    return response
 
 
 # Start server when `python main.py` is run
@@ -55,9 +183,35 @@ if __name__ == "__main__":
 
     # Run on local server
     port = "8000"
+    options = {}
+    # Settings are passed on in their environment variables as well: worker processes import this module anew
+    # unless they are forked, and only see the flags that way
+    settings = {}
     for i in range(len(sys.argv) - 1):
         if sys.argv[i] == '--port':
             port = sys.argv[i+1]
-        elif sys.argv[i] == '--seed':
-            random_seed = int(sys.argv[i+1])
-    run_server({"info": info, "start": start, "move": move, "end": end, "port": port})
+        elif sys.argv[i] == '--host':
+            options["host"] = sys.argv[i+1]
+        elif sys.argv[i] == '--workers':
+            options["workers"] = int(sys.argv[i+1])
+        elif sys.argv[i] == '--search-workers':
+            settings["SEARCH_WORKERS"] = sys.argv[i+1]
+            SEARCH_WORKERS = int(sys.argv[i+1])
+        elif sys.argv[i] == '--engine':
+            settings["ENGINE"] = sys.argv[i+1]
+            ENGINE = sys.argv[i+1]
+        elif sys.argv[i] == '--profile-every':
+            settings["PROFILE_EVERY"] = sys.argv[i+1]
+            profiler.every = int(sys.argv[i+1])
+    if '--ponder' in sys.argv:
+        settings["PONDER"] = "1"
+        PONDER = True
+    if '--metrics' in sys.argv:
+        settings["METRICS"] = "1"
+        METRICS = True
+    os.environ.update(settings)
+    # Serve concurrent games from worker processes
+    if '--production' in sys.argv:
+        options["server_mode"] = "production"
+    run_server({"info": info, "start": start, "move": move, "end": end, "fallback": fallback_move, "port": port,
+                **options})
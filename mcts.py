@@ -0,0 +1,336 @@
+import math
+import os
+import random
+import time
+import typing
+
+from board import Board
+from minimax_search import get_playable_moves, get_safe_moves
+
+
+# Weight of the exploration term of UCB1
+MCTS_EXPLORATION = float(os.environ.get('MCTS_EXPLORATION', '1.4'))
+# Turns played by a rollout before it is scored by which snakes are still alive
+MCTS_ROLLOUT_DEPTH = int(os.environ.get('MCTS_ROLLOUT_DEPTH', '15'))
+# Nodes the tree may hold; past it playouts still run but the tree stops growing
+MCTS_MAX_NODES = int(os.environ.get('MCTS_MAX_NODES', '200000'))
+
+
+class PlayoutStats:
+    """
+    Counters collected while searching for a move with MCTS.
+
+    Attributes:
+      playouts:
+        Number of playouts run.
+      nodes:
+        Number of nodes added to the tree.
+      reused:
+        Playouts of the previous turn already behind the root when the search started.
+      seconds:
+        Time spent searching.
+    """
+
+    def __init__(self):
+        """
+        Initializes the PlayoutStats class.
+        """
+        self.playouts = 0
+        self.nodes = 0
+        self.reused = 0
+        self.seconds = 0.0
+
+    @property
+    def playouts_per_second(self) -> float:
+        """
+        Playout throughput of the search.
+        """
+        return self.playouts / self.seconds if self.seconds else 0.0
+
+
+class Node:
+    """
+    A position of the tree, with the statistics of every snake's moves kept apart (decoupled UCT).
+
+    Snakes move simultaneously, so every snake picks its own move by UCB1 on its own statistics, and the
+    child is the position reached by the joint move.
+
+    Attributes:
+      moves:
+        The moves considered for every snake, indexed like ``board.snakes``; ``(None,)`` for eliminated snakes.
+      visits:
+        Per snake, the number of playouts through each of its moves.
+      totals:
+        Per snake, the summed rewards of the playouts through each of its moves.
+      children:
+        The positions reached so far, by joint move tuple.
+      n:
+        Number of playouts through the node.
+    """
+    __slots__ = ('moves', 'visits', 'totals', 'children', 'n')
+
+    def __init__(self, board: Board):
+        """
+        Creates the node of the current position of a board.
+
+        Args:
+          board:
+            The board in the position of the node.
+        """
+        self.moves = [candidate_moves(board, slot) for slot in range(len(board.snakes))]
+        self.visits = [[0] * len(moves) for moves in self.moves]
+        self.totals = [[0.0] * len(moves) for moves in self.moves]
+        self.children = {}
+        self.n = 0
+
+
+class SearchTree:
+    """
+    The tree of a game, kept between turns so that the playouts below the position actually reached are reused.
+
+    Attributes:
+      board:
+        The board of the root position.
+      root:
+        The root node, or None before the first search.
+      size:
+        Estimated number of nodes in the tree.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty SearchTree.
+        """
+        self.board = None
+        self.root = None
+        self.size = 0
+
+    def advance(self, board: Board) -> int:
+        """
+        Moves the root to the position of a new turn, keeping the subtree of the previous turn that led there.
+
+        Every joint move below the old root is replayed to find the child with the same snakes and bodies.
+        Food that spawned in between is ignored. The tree is started over if no child matches, e.g. when
+        a snake was eliminated and the slots of the snakes changed.
+
+        Args:
+          board:
+            The board of the new turn; the tree keeps it until the next turn.
+
+        Returns:
+          Number of playouts already behind the new root.
+        """
+        old_board, old_root = self.board, self.root
+        self.board, self.root, self.size = board, None, 0
+        if old_root is not None and old_board.width == board.width and old_board.height == board.height:
+            signature = _signature(board)
+            for joint, child in old_root.children.items():
+                old_board.make_move(joint)
+                matched = _signature(old_board) == signature
+                old_board.unmake_move()
+                if matched:
+                    self.root, self.size = child, child.n + 1
+                    return child.n
+        self.root, self.size = Node(board), 1
+        return 0
+
+
+def _signature(board: Board) -> tuple:
+    """
+    The snakes of a position and their bodies, or None if a snake has been eliminated.
+    """
+    if not all(snake.alive for snake in board.snakes):
+        return None
+    return board.you, tuple((snake.id, tuple(snake.body)) for snake in board.snakes)
+
+
+def candidate_moves(board: Board, slot: int) -> typing.Tuple[str | None, ...]:
+    """
+    Moves a snake may make from the current position: its safe moves, or a losing move if it has none.
+
+    Args:
+      board:
+        The board representation of the game state.
+      slot:
+        Index of the snake in ``board.snakes``.
+
+    Returns:
+      The moves, or ``(None,)`` for an eliminated snake.
+    """
+    if not board.snakes[slot].alive:
+        return (None,)
+    return tuple(get_playable_moves(board, slot))
+
+
+def is_game_over(board: Board) -> bool:
+    """
+    Checks if a playout has ended: our snake is out, or at most one snake is left in a game of several.
+    """
+    if board.is_terminal():
+        return True
+    return len(board.snakes) > 1 and sum(snake.alive for snake in board.snakes) <= 1
+
+
+def rewards(board: Board) -> typing.List[float]:
+    """
+    Reward of every snake at the end of a playout: eliminated snakes get 0 and the survivors share 1.
+    """
+    alive = [snake.alive for snake in board.snakes]
+    share = 1.0 / (sum(alive) or 1)
+    return [share if snake_alive else 0.0 for snake_alive in alive]
+
+
+def rollout(board: Board, rng: random.Random, depth: int) -> typing.List[float]:
+    """
+    Plays random safe moves for every snake until the game is over or for ``depth`` turns.
+
+    The moves are made on the board in place; the caller rewinds it.
+
+    Args:
+      board:
+        The board to play on.
+      rng:
+        Random generator of the moves.
+      depth:
+        The longest rollout, in turns.
+
+    Returns:
+      The reward of every snake at the end of the rollout.
+    """
+    snakes = board.snakes
+    for _ in range(depth):
+        if is_game_over(board):
+            break
+        moves = []
+        for slot, snake in enumerate(snakes):
+            if not snake.alive:
+                moves.append(None)
+                continue
+            safe_moves = get_safe_moves(board, slot)
+            moves.append(rng.choice(safe_moves) if safe_moves else None)
+        board.make_move(moves)
+    return rewards(board)
+
+
+def _select(node: Node, slot: int, exploration: float) -> int:
+    """
+    Picks the move of one snake at a node by UCB1, trying every move once first.
+
+    Returns:
+      Index of the move in ``node.moves[slot]``.
+    """
+    visits = node.visits[slot]
+    if len(visits) == 1:
+        return 0
+    totals = node.totals[slot]
+    log_n = math.log(node.n or 1)
+    best, best_score = 0, -1.0
+    for i, count in enumerate(visits):
+        if not count:
+            return i
+        score = totals[i] / count + exploration * math.sqrt(log_n / count)
+        if score > best_score:
+            best, best_score = i, score
+    return best
+
+
+def playout(tree: SearchTree, rng: random.Random, exploration: float, rollout_depth: int, max_nodes: int) -> bool:
+    """
+    Runs one playout: descends the tree by decoupled UCB1, adds the first position outside it, rolls out
+    from there and adds the rewards to every node on the way.
+
+    Args:
+      tree:
+        The tree; its board is left unchanged.
+      rng:
+        Random generator of the rollout.
+      exploration:
+        Weight of the exploration term of UCB1.
+      rollout_depth:
+        The longest rollout, in turns.
+      max_nodes:
+        Size past which no nodes are added.
+
+    Returns:
+      True if a node was added.
+    """
+    board = tree.board
+    root_ply = board.ply
+    node = tree.root
+    path = []
+    added = False
+    while True:
+        if is_game_over(board):
+            scores = rewards(board)
+            break
+        choice = tuple(_select(node, slot, exploration) for slot in range(len(node.moves)))
+        joint = tuple(moves[i] for moves, i in zip(node.moves, choice))
+        path.append((node, choice))
+        board.make_move(joint)
+        child = node.children.get(joint)
+        if child is None:
+            if tree.size < max_nodes:
+                node.children[joint] = Node(board)
+                tree.size += 1
+                added = True
+            scores = rollout(board, rng, rollout_depth)
+            break
+        node = child
+    board.rewind(root_ply)
+
+    for node, choice in path:
+        node.n += 1
+        for slot, i in enumerate(choice):
+            node.visits[slot][i] += 1
+            node.totals[slot][i] += scores[slot]
+    return added
+
+
+def mcts_search(board: Board, deadline: float, tree: SearchTree | None=None, stats: PlayoutStats | None=None, rng: random.Random | None=None, max_playouts: int | None=None) -> str | None:
+    """
+    Monte Carlo tree search for our move with decoupled UCT: every snake picks its moves by UCB1 on its own
+    statistics, and rollouts play random safe moves.
+
+    Args:
+      board:
+        The board of the current turn. It becomes the root of the tree and must not be changed until the
+        next turn.
+      deadline:
+        The ``time.perf_counter()`` value by which the search must return. At least one playout always runs.
+      tree:
+        The tree of the game, moved to the new position so the playouts of the last turn are reused. A new
+        one is created if not given.
+      stats:
+        Optional counters, filled with the playouts run.
+      rng:
+        Random generator of the rollouts.
+      max_playouts:
+        Optional number of playouts after which the search stops, e.g. for repeatable benchmarks.
+
+    Returns:
+      Our most visited move, or None if the game is already over.
+    """
+    started = time.perf_counter()
+    if tree is None:
+        tree = SearchTree()
+    if stats is None:
+        stats = PlayoutStats()
+    if rng is None:
+        rng = random.Random()
+    stats.reused = tree.advance(board)
+    if is_game_over(board):
+        return None
+
+    while True:
+        if playout(tree, rng, MCTS_EXPLORATION, MCTS_ROLLOUT_DEPTH, MCTS_MAX_NODES):
+            stats.nodes += 1
+        stats.playouts += 1
+        if max_playouts is not None and stats.playouts >= max_playouts:
+            break
+        if time.perf_counter() >= deadline:
+            break
+    stats.seconds = time.perf_counter() - started
+
+    root = tree.root
+    visits = root.visits[board.you]
+    return root.moves[board.you][visits.index(max(visits))]
@@ -0,0 +1,150 @@
+import bisect
+import os
+import threading
+import typing
+
+from json_codec import dumps
+
+
+# Collect per-move measurements (METRICS=1); when off, moves skip every timer and counter that exists only for this
+METRICS = os.environ.get("METRICS", "0") == "1"
+# Optional file every measured move is appended to as one JSON line
+METRICS_LOG = os.environ.get("METRICS_LOG")
+
+# Upper bounds of the histogram buckets of every measurement
+MILLISECOND_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 200, 300, 400, 500, 750, 1000)
+BUCKETS = {
+    "decode_ms": MILLISECOND_BUCKETS,
+    "parse_ms": MILLISECOND_BUCKETS,
+    "search_ms": MILLISECOND_BUCKETS,
+    "eval_ms": MILLISECOND_BUCKETS,
+    "nodes_per_second": (1000, 2000, 5000, 10000, 20000, 50000, 100000, 200000, 500000),
+    "depth": (1, 2, 3, 4, 5, 6, 8, 10, 12, 16, 24, 32),
+    "tt_hit_rate": (0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+    "cutoffs": (10, 100, 1000, 10000, 100000, 1000000),
+    "playouts_per_second": (100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000),
+}
+
+
+
+def percentile(values: typing.Sequence[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of a list of values, 0 for an empty list.
+    """
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+class Histogram:
+    """
+    Cumulative histogram of one measurement, in the shape Prometheus expects.
+
+    Attributes:
+      buckets:
+        Upper bounds of the buckets, ascending.
+      counts:
+        Number of observations per bucket, the last one for values above every bound.
+      total:
+        Sum of all observations.
+      count:
+        Number of observations.
+    """
+
+    def __init__(self, buckets: typing.Sequence[float]):
+        """
+        Initializes the Histogram class.
+
+        Args:
+          buckets:
+            Upper bounds of the buckets, ascending.
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """
+        Adds an observation.
+
+        Args:
+          value:
+            The measured value.
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name: str) -> typing.List[str]:
+        """
+        Formats the histogram in the Prometheus text format.
+
+        Args:
+          name:
+            The metric name.
+
+        Returns:
+          The lines of the metric.
+        """
+        lines = [f"# TYPE {name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum {self.total}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+class MoveMetrics:
+    """
+    Histograms of the measurements of every /move request, kept by the server process.
+
+    Attributes:
+      histograms:
+        Histogram of every measurement, by name.
+      log_path:
+        File every sample is appended to as one JSON line, or None.
+    """
+
+    def __init__(self, log_path: str | None = METRICS_LOG):
+        """
+        Initializes the MoveMetrics class.
+
+        Args:
+          log_path:
+            File to append every sample to, or None.
+        """
+        self.histograms = {name: Histogram(buckets) for name, buckets in BUCKETS.items()}
+        self.log_path = log_path
+        self._log = None
+        self._lock = threading.Lock()
+
+    def record(self, sample: typing.Dict):
+        """
+        Adds the measurements of one move.
+
+        Args:
+          sample:
+            Measurements by name; names without a histogram and missing values are only logged.
+        """
+        with self._lock:
+            for name, value in sample.items():
+                histogram = self.histograms.get(name)
+                if histogram is not None and value is not None:
+                    histogram.observe(value)
+            if self.log_path is not None:
+                if self._log is None:
+                    self._log = open(self.log_path, "ab")
+                self._log.write(dumps(sample) + b"\n")
+                self._log.flush()
+
+    def render(self) -> str:
+        """
+        Formats every histogram in the Prometheus text format, for /metrics.
+        """
+        with self._lock:
+            lines = []
+            for name, histogram in self.histograms.items():
+                lines += histogram.render(f"battlesnake_move_{name}")
+        return "\n".join(lines) + "\n"
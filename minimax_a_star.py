@@ -1,16 +1,24 @@
 import typing
 
 import numpy as np
-from collections import deque
 
+from area_cache import AreaCache
+from board import MAX_HEALTH
+from geometry import MOVE_DELTAS, MOVES, geometry
 from helpers import manhattan_distance, is_point_on_board, is_terminal
-from a_star import a_star_search, Node, trace_path
+from flood_fill import calculate_area_control_batch, nearest_food_batch
+from food_search import find_food_in_state
+from persistent_state import assoc, move_snake, with_you, without_food
+from transposition import TranspositionTable, hash_game_state, MINIMIZING_KEY, EXACT, LOWER_BOUND, UPPER_BOUND
 
 
 # Constants for heuristic evaluation
 POSITIVE_INFINITY = float('inf')
 NEGATIVE_INFINITY = -float('inf')
 
+# Free regions of the occupancy grids seen by the search (AREA_CACHE_MB), shared by every search of the process
+area_cache = AreaCache()
+
 
 def get_safe_moves(game_state: typing.Dict) -> typing.List[str]:
     """
@@ -23,34 +31,14 @@ def get_safe_moves(game_state: typing.Dict) -> typing.List[str]:
     Returns:
       A list of possible moves.
     """
-    board_width = game_state['board']['width']
-    board_height = game_state['board']['height']
-    my_head = game_state['you']['body'][0]  # Head of our snake
-    my_body = game_state['you']['body']     # All body coordinates of our snake
-
-    # Define the possible moves
-    possible_moves = ['up', 'down', 'left', 'right']
-    safe_moves = []
-
-    # Check each possible move for safety
-    for move in possible_moves:
-        new_x, new_y = my_head['x'], my_head['y']
-        if move == 'up':
-            new_y += 1
-        elif move == 'down':
-            new_y -= 1
-        elif move == 'left':
-            new_x -= 1
-        elif move == 'right':
-            new_x += 1
-
-        # Check if the move is within the boundaries of the board
-        if 0 <= new_x < board_width and 0 <= new_y < board_height:
-            # Check if the move doesn't collide with our snake's body
-            if not any(part['x'] == new_x and part['y'] == new_y for part in my_body):
-                safe_moves.append(move)
-
-    return safe_moves
+    width, height = game_state['board']['width'], game_state['board']['height']
+    tables = geometry(width, height)
+    # Cells of our snake's body
+    my_body = {part['y'] * width + part['x'] for part in game_state['you']['body'] if is_point_on_board(part, width, height)}
+
+    # A move is safe if it stays on the board and doesn't run into our snake's body
+    return [move for move, cell in zip(MOVES, tables.neighbours_of(game_state['you']['body'][0]))
+            if cell >= 0 and cell not in my_body]
 
 
 def is_dead_end(head: dict, game_state: typing.Dict) -> bool:
@@ -67,21 +55,18 @@ def is_dead_end(head: dict, game_state: typing.Dict) -> bool:
     Returns:
       True if there is a dead-end.
     """
-    # Simplified check for dead-ends. This could be replaced with a more complex flood-fill.
-    # For now, we just check if there are less than two safe moves from the new head position
-    safe_move_count = 0
-    moves = [('up', 0, 1), ('down', 0, -1), ('left', -1, 0), ('right', 1, 0)]
-    for move in moves:
-        x, y = head['x'] + move[1], head['y'] + move[2]
-        if 0 <= x < game_state['board']['width'] and 0 <= y < game_state['board']['height']:
-            if not any(part['x'] == x and part['y'] == y for part in game_state['you']['body']):
-                safe_move_count += 1
+    width, height = game_state['board']['width'], game_state['board']['height']
+    tables = geometry(width, height)
+    my_body = {part['y'] * width + part['x'] for part in game_state['you']['body'] if is_point_on_board(part, width, height)}
+    safe_move_count = sum(1 for cell in tables.neighbours_of(head) if cell >= 0 and cell not in my_body)
     return safe_move_count < 2  # Considered a dead-end if less than two safe moves
 
 
 def apply_move(game_state: typing.Dict, move: str) -> typing.Dict:
     """
-    Updates game state by simulating the effect of a move.
+    Updates game state by simulating the effect of a move. Like in ``Board.make_move`` our snake loses one
+    health, and eats the food it moves onto, restoring its health and growing by its tail. The state is not
+    changed; the new one shares everything the move leaves alone with it (see ``persistent_state``).
 
     Args:
       game_state:
@@ -92,31 +77,16 @@ def apply_move(game_state: typing.Dict, move: str) -> typing.Dict:
     Returns:
       The new game state after the move.
     """
-    # Shallow copy the game state (deep copy is avoided for performance reasons)
-    new_state = {
-        'you': {
-            'body': [{'x': game_state['you']['body'][0]['x'], 'y': game_state['you']['body'][0]['y']}] + game_state['you']['body'][:-1],
-            'health': game_state['you']['health'],
-            'id': game_state['you']['id']
-        },
-        'board': {
-            'width': game_state['board']['width'],
-            'height': game_state['board']['height'],
-            'food': game_state['board']['food'],
-            'snakes': game_state['board']['snakes']
-        }
-    }
-    # Update the head position based on the move
-    if move == 'up':
-        new_state['you']['body'][0]['y'] += 1
-    elif move == 'down':
-        new_state['you']['body'][0]['y'] -= 1
-    elif move == 'left':
-        new_state['you']['body'][0]['x'] -= 1
-    elif move == 'right':
-        new_state['you']['body'][0]['x'] += 1
-
-    return new_state
+    you = game_state['you']
+    dx, dy = MOVE_DELTAS[move]
+    x, y = you['body'][0]['x'] + dx, you['body'][0]['y'] + dy
+    eats = any(point['x'] == x and point['y'] == y for point in game_state['board']['food'])
+    moved = move_snake(you, move, grow=eats)
+    if not eats:
+        # Only our snake and its body are new; the board, the other segments and the food are shared with the parent
+        return with_you(game_state, assoc(moved, 'health', you['health'] - 1))
+    # Eating also copies the board and its food list, but the snakes are still shared
+    return without_food(with_you(game_state, assoc(moved, 'health', MAX_HEALTH)), moved['body'][0])
 
 
 def calculate_area_control(game_state: typing.Dict, head: dict) -> int:
@@ -134,31 +104,20 @@ def calculate_area_control(game_state: typing.Dict, head: dict) -> int:
     """
     board_width = game_state['board']['width']
     board_height = game_state['board']['height']
+    tables = geometry(board_width, board_height)
     # Initialize a grid to represent the board
-    board_grid = np.zeros((board_width, board_height), dtype=int)
+    board_grid = bytearray(board_width * board_height)
 
     # Mark the position of all snakes on the board
     for snake in game_state['board']['snakes']:
         for segment in snake['body']:
             if is_point_on_board(segment, board_width, board_height):
                 # Mark the segment as occupied
-                board_grid[segment['x']][segment['y']] = 1
-
-    # Flood fill from our snake's head to determine the size of the area we control
-    area = 0
-    queue = deque([head])
-    directions = [{'x': 0, 'y': 1}, {'x': 1, 'y': 0},
-                  {'x': 0, 'y': -1}, {'x': -1, 'y': 0}]
-    while queue:
-        current = queue.popleft()
-        for direction in directions:
-            neighbor = {'x': current['x'] + direction['x'],
-                        'y': current['y'] + direction['y']}
-            if is_point_on_board(neighbor, board_width, board_height) and board_grid[neighbor['x']][neighbor['y']] == 0:
-                board_grid[neighbor['x']][neighbor['y']] = 1  # Mark as visited
-                area += 1
-                queue.append(neighbor)
-    return area
+                board_grid[segment['y'] * board_width + segment['x']] = 1
+
+    # The area we control is the size of the free regions next to our snake's head
+    start = [cell for cell in tables.neighbours_of(head) if cell >= 0]
+    return area_cache.area((board_width, board_height), bytes(board_grid), tables.adjacent, start)
 
 
 # The evaluation heuristic function
@@ -191,9 +150,8 @@ def evaluation_heuristic(game_state: typing.Dict) -> float:
             score -= max(10 - distance_to_snake, 0) / 10.0
 
     # If low on health, prioritize food more
-    if my_health < 50 and game_state['board']['food']:
-        closest_food_distance = min(manhattan_distance(
-            my_head, food) for food in game_state['board']['food'])
+    closest_food_distance = find_food_in_state(game_state).nearest_distance if my_health < 50 else None
+    if closest_food_distance is not None:
         # score += 10 / (closest_food_distance + 1)  # Increase score based on proximity to food when health is low
         # Adjust scoring for health urgency
         if my_health < 15:  # Increase urgency
@@ -209,7 +167,201 @@ def evaluation_heuristic(game_state: typing.Dict) -> float:
     return score
 
 
-def minimax(game_state: typing.Dict, depth: int, alpha: float = NEGATIVE_INFINITY, beta: float = POSITIVE_INFINITY, maximizing_player: bool = True) -> typing.Tuple[float, str | None]:
+class StateBatch:
+    """
+    Game states of one board size stacked into arrays, the input of ``evaluation_heuristic_batch``.
+
+    Attributes:
+      health:
+        (states,) health of our snake.
+      length:
+        (states,) length of our snake.
+      heads:
+        (states, 2) x and y of our head.
+      obstacles:
+        (states, height, width) cells taken by the snakes of the board, the grid of ``calculate_area_control``.
+      free_at:
+        (states, height, width) number of moves after which every cell is free, for the food search.
+      food:
+        (states, height, width) cells with food.
+      opponent_heads:
+        (states, opponents, 2) x and y of the heads of the other snakes, padded to the most opponents.
+      opponent_mask:
+        (states, opponents) True where ``opponent_heads`` holds a snake.
+      areas:
+        (states,) area control already computed, from the area cache or for heads off the board; -1 where it is
+        left to the batched flood fill.
+    """
+
+    def __init__(self, health, length, heads, obstacles, free_at, food, opponent_heads, opponent_mask, areas):
+        """
+        Initializes the StateBatch class.
+        """
+        self.health = health
+        self.length = length
+        self.heads = heads
+        self.obstacles = obstacles
+        self.free_at = free_at
+        self.food = food
+        self.opponent_heads = opponent_heads
+        self.opponent_mask = opponent_mask
+        self.areas = areas
+
+
+def stack_states(game_states: typing.Sequence[typing.Dict]) -> StateBatch:
+    """
+    Stacks game states of the same board size into arrays.
+
+    States of a search share the snake and food lists their moves left alone, and a shared list is never
+    changed (see ``persistent_state``); the grids built from a shared list are built once and reused.
+
+    Args:
+      game_states:
+        The states to stack.
+
+    Returns:
+      The stacked states.
+    """
+    width = game_states[0]['board']['width']
+    height = game_states[0]['board']['height']
+    states = len(game_states)
+    health = np.empty(states)
+    length = np.empty(states)
+    heads = np.empty((states, 2), dtype=int)
+    obstacles = np.zeros((states, height, width), dtype=bool)
+    free_at = np.zeros((states, height, width), dtype=np.int32)
+    food = np.zeros((states, height, width), dtype=bool)
+    areas = np.full(states, -1)
+    opponents = []
+
+    snakes_grids = {}
+    food_grids = {}
+    for i, game_state in enumerate(game_states):
+        you = game_state['you']
+        body = you['body']
+        health[i] = you['health']
+        length[i] = len(body)
+        heads[i] = body[0]['x'], body[0]['y']
+
+        snakes = game_state['board']['snakes']
+        grids = snakes_grids.get((id(snakes), you['id']))
+        if grids is None:
+            blocked = np.zeros((height, width), dtype=bool)
+            timing = np.zeros((height, width), dtype=np.int32)
+            others = []
+            for snake in snakes:
+                own = snake['id'] == you['id']
+                if not own:
+                    others.append((snake['body'][0]['x'], snake['body'][0]['y']))
+                for k, part in enumerate(snake['body']):
+                    if is_point_on_board(part, width, height):
+                        blocked[part['y'], part['x']] = True
+                        if not own:
+                            timing[part['y'], part['x']] = max(timing[part['y'], part['x']], len(snake['body']) - k)
+            grids = snakes_grids[(id(snakes), you['id'])] = (blocked, timing, others)
+        blocked, timing, others = grids
+        obstacles[i] = blocked
+        free_at[i] = timing
+        opponents.append(others)
+        # Our own body is timed from ``you``, which moves away from the copy in the snake list
+        for k, part in enumerate(body):
+            if is_point_on_board(part, width, height):
+                free_at[i, part['y'], part['x']] = max(free_at[i, part['y'], part['x']], len(body) - k)
+
+        points = game_state['board']['food']
+        grid = food_grids.get(id(points))
+        if grid is None:
+            grid = food_grids[id(points)] = np.zeros((height, width), dtype=bool)
+            for point in points:
+                grid[point['y'], point['x']] = True
+        food[i] = grid
+
+        # With the cache, siblings that share an occupancy grid get their area from one labelling
+        if area_cache.enabled or not is_point_on_board(body[0], width, height):
+            areas[i] = calculate_area_control(game_state, body[0])
+
+    most = max((len(others) for others in opponents), default=0)
+    opponent_heads = np.zeros((states, most, 2), dtype=int)
+    opponent_mask = np.zeros((states, most), dtype=bool)
+    for i, others in enumerate(opponents):
+        if others:
+            opponent_heads[i, :len(others)] = others
+            opponent_mask[i, :len(others)] = True
+    return StateBatch(health, length, heads, obstacles, free_at, food, opponent_heads, opponent_mask, areas)
+
+
+def evaluation_heuristic_batch(batch: StateBatch) -> np.ndarray:
+    """
+    Scores a batch of states with array operations; every score matches ``evaluation_heuristic``.
+
+    Args:
+      batch:
+        The stacked states.
+
+    Returns:
+      The (states,) scores.
+    """
+    states, height, width = batch.obstacles.shape
+    x, y = batch.heads[:, 0], batch.heads[:, 1]
+    on_board = (0 <= x) & (x < width) & (0 <= y) & (y < height)
+    cells = np.where(on_board, y * width + x, 0)
+
+    # Base score from health and length
+    score = batch.health / 100.0 + batch.length
+
+    # Area control; a free head counts only if the fill can come back to it, unlike in the batched kernel
+    areas = batch.areas
+    missing = areas < 0
+    if missing.any():
+        filled = calculate_area_control_batch(batch.obstacles[missing], cells[missing])
+        head_free = ~batch.obstacles[missing].reshape(len(filled), -1)[np.arange(len(filled)), cells[missing]]
+        areas = areas.copy()
+        areas[missing] = np.where(head_free & (filled == 1), 0, filled)
+    score += areas / 10.0
+
+    # Penalize closeness to other snakes, one snake at a time so that the sums round like the single-state version
+    distances = np.abs(batch.opponent_heads[:, :, 0] - x[:, None]) + np.abs(batch.opponent_heads[:, :, 1] - y[:, None])
+    penalties = np.maximum(10 - distances, 0) * batch.opponent_mask / 10.0
+    for opponent in range(penalties.shape[1]):
+        score -= penalties[:, opponent]
+
+    # If low on health, prioritize food more, with more urgency the lower it is
+    hungry = np.flatnonzero((batch.health < 50) & on_board)
+    if hungry.size:
+        food_distances = nearest_food_batch(batch.free_at[hungry], cells[hungry], batch.food[hungry])
+        health = batch.health[hungry]
+        urgency = np.select([health < 15, health < 25], [20.0, 15.0], 10.0)
+        reachable = food_distances >= 0
+        score[hungry[reachable]] += urgency[reachable] / (food_distances[reachable] + 1)
+
+    return score
+
+
+def _leaf_values(game_states: typing.List[typing.Dict], table: TranspositionTable | None) -> typing.List[float]:
+    """
+    Values of the children of a node one move above the leaves, as ``minimax`` would return them at depth 0.
+
+    Leaves found in the table keep their stored value; the others are scored in one batched evaluation.
+    """
+    values = [None] * len(game_states)
+    keys = [0] * len(game_states)
+    if table is not None:
+        for i, game_state in enumerate(game_states):
+            keys[i] = hash_game_state(game_state) ^ MINIMIZING_KEY
+            entry = table.probe(keys[i])
+            if entry is not None and entry[3] == EXACT:
+                values[i] = entry[2]
+    missing = [i for i, value in enumerate(values) if value is None]
+    if missing:
+        scores = evaluation_heuristic_batch(stack_states([game_states[i] for i in missing]))
+        for i, value in zip(missing, scores.tolist()):
+            values[i] = value
+            if table is not None:
+                table.store(keys[i], 0, value, EXACT, None)
+    return values
+
+
+def minimax(game_state: typing.Dict, depth: int, alpha: float = NEGATIVE_INFINITY, beta: float = POSITIVE_INFINITY, maximizing_player: bool = True, table: TranspositionTable | None = None) -> typing.Tuple[float, str | None]:
     """
     An adversarial search algorithm that tries to maximize a score while assuming that an opposing agent is
     trying to minimize the score. Utilized alpha-beta pruning for efficiency.
@@ -221,94 +373,95 @@ def minimax(game_state: typing.Dict, depth: int, alpha: float = NEGATIVE_INFINIT
         The depth of the search tree.
       maximizing_player:
         The player doing the maximizing.
+      table:
+        Optional transposition table to look positions up in and store results to.
 
     Returns:
       The best move and its associated value.
     """
-    # Get list of food nodes
-    foods = game_state["board"]["food"]
-    start = game_state['you']['body'][0]
-
-    max_possible_paths = []
-    min_possible_paths = []
+    # Look the position up in the transposition table; a deep enough entry may settle it right away
+    alpha_original, beta_original = alpha, beta
+    key = 0
+    if table is not None:
+        key = hash_game_state(game_state)
+        if not maximizing_player:
+            key ^= MINIMIZING_KEY
+        entry = table.probe(key)
+        if entry is not None and entry[1] >= depth:
+            _, _, entry_value, bound, entry_move, _ = entry
+            if bound == EXACT:
+                return entry_value, entry_move
+            if bound == LOWER_BOUND:
+                alpha = max(alpha, entry_value)
+            else:
+                beta = min(beta, entry_value)
+            if alpha >= beta:
+                return entry_value, entry_move
 
     # Base case: if we've reached the maximum depth or the game is over, evaluate the game state
     if depth == 0 or is_terminal(game_state):
-        return evaluation_heuristic(game_state), None
+        value = evaluation_heuristic(game_state)
+        if table is not None:
+            table.store(key, depth, value, EXACT, None)
+        return value, None
     if maximizing_player:
         # Initialize the best value to the lowest possible number
         value = NEGATIVE_INFINITY
         # Initialize the best move to None
         best_move = None
 
-        # Perform A* search for all foods. This will return optimal paths to all foods.
-        for food in foods:
-            result = a_star_search(game_state, start, food)
-            if result is not None:
-                max_possible_paths.append(result)
+        # One search finds the first move of a shortest path to every food, nearest food first
+        food_paths = find_food_in_state(game_state)
 
         # Explore all possible safe moves for the maximizing player
-        for max_possible_path in max_possible_paths:
-            # Get the next possible move
-            next_move = max_possible_path[1]
-            row, col = next_move[0] - start["x"], next_move[1] - start["y"]
-            if row == 1:
-                move_option = "right"
-            elif row == -1:
-                move_option = "left"
-            elif col == 1:
-                move_option = "up"
-            elif col == -1:
-                move_option = "down"
-            # Apply the move to get a new game state
-            new_state = apply_move(game_state, move_option)
-            # Recursively call minimax for the new state, decreasing the depth
-            new_value, _ = minimax(new_state, depth-1, alpha, beta, False)
+        move_options = list(dict.fromkeys(food_paths.moves.values()))
+        # One move above the leaves, all children are scored together in one batched evaluation
+        leaf_values = _leaf_values([apply_move(game_state, move) for move in move_options], table) if depth == 1 else None
+        for i, move_option in enumerate(move_options):
+            if leaf_values is not None:
+                new_value = leaf_values[i]
+            else:
+                # Apply the move to get a new game state
+                new_state = apply_move(game_state, move_option)
+                # Recursively call minimax for the new state, decreasing the depth
+                new_value, _ = minimax(new_state, depth-1, alpha, beta, False, table)
             # Update the best value - maximum and move if the new value is better
             if new_value > value:
                 value, best_move = new_value, move_option
             alpha = max(alpha, value)
             if alpha >= beta:
                 break  # Beta cutoff
-
-        # Return the best value and move found for the maximizing player
-        return value, best_move
     else:
         # Initialize the best value to the highest possible number
         value = POSITIVE_INFINITY
         # Initialize the best move to None
         best_move = None
 
-        # Perform A* search for all foods. This will return optimal paths to all foods.
-        for food in foods:
-            result = a_star_search(game_state, start, food)
-            if result is not None:
-                min_possible_paths.append(result)
+        # One search finds the first move of a shortest path to every food, nearest food first
+        food_paths = find_food_in_state(game_state)
 
         # Explore all possible safe moves for the minimizing player
-        for min_possible_path in min_possible_paths:
-            # Get the next possible move
-            next_move = min_possible_path[1]
-            row, col = next_move[0] - start["x"], next_move[1] - start["y"]
-            if row == 1:
-                move_option = "right"
-            elif row == -1:
-                move_option = "left"
-            elif col == 1:
-                move_option = "up"
-            elif col == -1:
-                move_option = "down"
+        for move_option in dict.fromkeys(food_paths.moves.values()):
             # Apply the move to get a new game state
             new_state = apply_move(game_state, move_option)
             # Recursively call minimax for the new state, decreasing the depth
-            new_value, _ = minimax(new_state, depth-1, alpha, beta, False)
-            # Update the best value - maximum and move if the new value is better
-            if new_value > value:
+            new_value, _ = minimax(new_state, depth-1, alpha, beta, True, table)
+            # Update the best value - minimum and move if the new value is better for the minimizing player
+            if new_value < value:
                 value, best_move = new_value, move_option
-            alpha = max(alpha, value)
-            if alpha >= beta:
-                break  # Beta cutoff
-
-        # Return the best value and move found for the minimizing player
-        return value, best_move
+            beta = min(beta, value)
+            if beta <= alpha:
+                break  # Alpha cutoff
+
+    # Remember the result, noting whether it is exact or only a bound because of a cutoff
+    if table is not None:
+        if value <= alpha_original:
+            table.store(key, depth, value, UPPER_BOUND, best_move)
+        elif value >= beta_original:
+            table.store(key, depth, value, LOWER_BOUND, best_move)
+        else:
+            table.store(key, depth, value, EXACT, best_move)
+
+    # Return the best value and move found
+    return value, best_move
     
\ No newline at end of file
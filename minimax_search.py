@@ -1,188 +1,248 @@
+import itertools
+import threading
+import time
 import typing
 
-import numpy as np
 from collections import deque
 
-from helpers import manhattan_distance, is_point_on_board, is_terminal
+from board import Board, MOVES
+from transposition import TranspositionTable, MINIMIZING_KEY, MOVE_KEYS, EXACT, LOWER_BOUND, UPPER_BOUND
+from move_ordering import MoveOrderer
+from territory import voronoi
 
 
 # Constants for heuristic evaluation
 POSITIVE_INFINITY = float('inf')
 NEGATIVE_INFINITY = -float('inf')
+# Score of a position where our snake has been eliminated, and bonus per eliminated opponent
+DEATH_SCORE = -1000.0
+KILL_SCORE = 100.0
 
+# Upper bound for iterative deepening on boards where the search never runs out of time
+MAX_SEARCH_DEPTH = 32
 
-def get_safe_moves(game_state: typing.Dict) -> typing.List[str]:
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the deadline passes, to abandon the current iteration.
+    """
+
+
+class SearchStats:
+    """
+    Counters collected while searching for a move.
+
+    Attributes:
+      nodes:
+        Number of nodes visited.
+      cutoffs:
+        Number of alpha-beta cutoffs.
+      depth_nodes:
+        Nodes visited by each finished iterative-deepening pass, indexed by depth - 1.
+      depth_values:
+        Value found by each finished iterative-deepening pass, indexed by depth - 1.
+      timed:
+        True to time the evaluations; off by default to keep timer calls out of the search.
+      evaluations:
+        Number of leaf evaluations, counted when timed.
+      eval_time:
+        Seconds spent in leaf evaluations, measured when timed.
+    """
+
+    def __init__(self, timed: bool=False):
+        """
+        Initializes the SearchStats class.
+
+        Args:
+          timed:
+            True to time the evaluations.
+        """
+        self.nodes = 0
+        self.cutoffs = 0
+        self.depth_nodes = []
+        self.depth_values = []
+        self.timed = timed
+        self.evaluations = 0
+        self.eval_time = 0.0
+
+    @property
+    def branching_factor(self) -> float:
+        """
+        Effective branching factor: growth in nodes between the last two finished passes.
+        """
+        if len(self.depth_nodes) < 2 or not self.depth_nodes[-2]:
+            return 0.0
+        return self.depth_nodes[-1] / self.depth_nodes[-2]
+
+
+def get_safe_moves(board: Board, snake_index: int | None=None) -> typing.List[str]:
     """
     Gets a list of safe move directions that do not immediately lead to death.
 
     Args:
-      game_state:
-        Information about the state space of the game.
+      board:
+        The board representation of the game state.
+      snake_index:
+        Index of the snake to move. Defaults to our snake.
 
     Returns:
       A list of possible moves.
     """
-    board_width = game_state['board']['width']
-    board_height = game_state['board']['height']
-    my_head = game_state['you']['body'][0]  # Head of our snake
-    my_body = game_state['you']['body']     # All body coordinates of our snake
-
-    # Define the possible moves
-    possible_moves = ['up', 'down', 'left', 'right']
+    if snake_index is None:
+        snake_index = board.you
+    neighbours = board.neighbours[board.snakes[snake_index].body[0]]
+    cells = board.cells
     safe_moves = []
 
     # Check each possible move for safety
-    for move in possible_moves:
-        new_x, new_y = my_head['x'], my_head['y']
-        if move == 'up':
-            new_y += 1
-        elif move == 'down':
-            new_y -= 1
-        elif move == 'left':
-            new_x -= 1
-        elif move == 'right':
-            new_x += 1
-
-        # Check if the move is within the boundaries of the board
-        if 0 <= new_x < board_width and 0 <= new_y < board_height:
-            # Check if the move doesn't collide with our snake's body
-            if not any(part['x'] == new_x and part['y'] == new_y for part in my_body):
-                safe_moves.append(move)
+    for move, cell in zip(MOVES, neighbours):
+        # Check if the move is within the boundaries of the board and doesn't collide with a snake
+        if cell >= 0 and not cells[cell]:
+            safe_moves.append(move)
 
     return safe_moves
 
 
-def is_dead_end(head: dict, game_state: typing.Dict) -> bool:
+def get_playable_moves(board: Board, snake_index: int) -> typing.List[str]:
     """
-    Simplified check for dead-ends. This could be replaced with a more complex flood-fill.
-    For now, we just check if there are less than two safe moves from the new head position.
+    Gets the moves a snake may make: its safe moves, or a losing move if it has none.
 
     Args:
-      head:
-        The head position of the snake.
-      game_state:
-        Information about the state space of the game.
+      board:
+        The board representation of the game state.
+      snake_index:
+        Index of the snake in ``board.snakes``.
 
     Returns:
-      True if there is a dead-end.
+      The safe moves, or else the first move that stays on the board (the first move if none does).
     """
-    # Simplified check for dead-ends. This could be replaced with a more complex flood-fill.
-    # For now, we just check if there are less than two safe moves from the new head position
-    safe_move_count = 0
-    moves = [('up', 0, 1), ('down', 0, -1), ('left', -1, 0), ('right', 1, 0)]
-    for move in moves:
-        x, y = head['x'] + move[1], head['y'] + move[2]
-        if 0 <= x < game_state['board']['width'] and 0 <= y < game_state['board']['height']:
-            if not any(part['x'] == x and part['y'] == y for part in game_state['you']['body']):
-                safe_move_count += 1
-    return safe_move_count < 2  # Considered a dead-end if less than two safe moves
+    moves = get_safe_moves(board, snake_index)
+    if not moves:
+        # Every move loses, but the snake still has to make one
+        head = board.snakes[snake_index].body[0]
+        moves = [move for move, cell in zip(MOVES, board.neighbours[head]) if cell >= 0][:1] or [MOVES[0]]
+    return moves
 
 
-def apply_move(game_state: typing.Dict, move: str) -> typing.Dict:
+def get_opponent_moves(board: Board, depth: int) -> typing.List[typing.Tuple[str | None, ...]]:
     """
-    Updates game state by simulating the effect of a move.
+    Gets every combination of opponent moves to consider against one of our moves.
+
+    Opponents only get their safe moves. An opponent whose head is too far away to meet ours within
+    the remaining depth gets its first safe move only, since its choice cannot affect us in the search.
 
     Args:
-      game_state:
-        Information about the state space of the game.
-      move:
-        The direction to move in.
+      board:
+        The board representation of the game state.
+      depth:
+        The remaining depth of the search, in turns.
+
+    Returns:
+      A list of move tuples indexed like ``board.snakes``, with None for our snake and eliminated snakes.
+    """
+    distance = board.geometry.distance[board.snakes[board.you].body[0]]
+    options = []
+    for index, snake in enumerate(board.snakes):
+        if index == board.you or not snake.alive:
+            options.append((None,))
+            continue
+        moves = get_playable_moves(board, index)
+        if distance[snake.body[0]] > 2 * depth:
+            moves = moves[:1]
+        options.append(moves)
+    return list(itertools.product(*options))
+
+
+def is_dead_end(head: int, board: Board) -> bool:
+    """
+    Simplified check for dead-ends. This could be replaced with a more complex flood-fill.
+    For now, we just check if there are less than two safe moves from the new head position.
+
+    Args:
+      head:
+        The head cell of the snake.
+      board:
+        The board representation of the game state.
 
     Returns:
-      The new game state after the move.
-    """
-    # Shallow copy the game state (deep copy is avoided for performance reasons)
-    new_state = {
-        'you': {
-            'body': [{'x': game_state['you']['body'][0]['x'], 'y': game_state['you']['body'][0]['y']}] + game_state['you']['body'][:-1],
-            'health': game_state['you']['health'],
-            'id': game_state['you']['id']
-        },
-        'board': {
-            'width': game_state['board']['width'],
-            'height': game_state['board']['height'],
-            'food': game_state['board']['food'],
-            'snakes': game_state['board']['snakes']
-        }
-    }
-    # Update the head position based on the move
-    if move == 'up': new_state['you']['body'][0]['y'] += 1
-    elif move == 'down': new_state['you']['body'][0]['y'] -= 1
-    elif move == 'left': new_state['you']['body'][0]['x'] -= 1
-    elif move == 'right': new_state['you']['body'][0]['x'] += 1
-
-    return new_state
-
-
-def calculate_area_control(game_state: typing.Dict, head: dict) -> int:
+      True if there is a dead-end.
+    """
+    cells = board.cells
+    safe_move_count = sum(1 for cell in board.neighbours[head] if cell >= 0 and not cells[cell])
+    return safe_move_count < 2  # Considered a dead-end if less than two safe moves
+
+
+def calculate_area_control(board: Board, head: int) -> int:
     """
     Estimates the area of the board controlled by our snake using a flood fill algorithm.
 
     Args:
-      game_state:
-        Information about the state space of the game.
+      board:
+        The board representation of the game state.
       head:
-        The head of the snake.
+        The head cell of the snake.
 
     Returns:
       Number of squares on the board controlled by our snake.
     """
-    board_width = game_state['board']['width']
-    board_height = game_state['board']['height']
-    board_grid = np.zeros((board_width, board_height), dtype=int)  # Initialize a grid to represent the board
-
-    # Mark the position of all snakes on the board
-    for snake in game_state['board']['snakes']:
-        for segment in snake['body']:
-            if is_point_on_board(segment, board_width, board_height):
-                board_grid[segment['x']][segment['y']] = 1  # Mark the segment as occupied
+    # Start from the occupancy grid so that snake segments are already marked
+    visited = bytearray(board.cells)
+    neighbours = board.neighbours
 
     # Flood fill from our snake's head to determine the size of the area we control
     area = 0
     queue = deque([head])
-    directions = [{'x': 0, 'y': 1}, {'x': 1, 'y': 0}, {'x': 0, 'y': -1}, {'x': -1, 'y': 0}]
     while queue:
         current = queue.popleft()
-        for direction in directions:
-            neighbor = {'x': current['x'] + direction['x'], 'y': current['y'] + direction['y']}
-            if is_point_on_board(neighbor, board_width, board_height) and board_grid[neighbor['x']][neighbor['y']] == 0:
-                board_grid[neighbor['x']][neighbor['y']] = 1  # Mark as visited
+        for neighbour in neighbours[current]:
+            if neighbour >= 0 and not visited[neighbour]:
+                visited[neighbour] = 1  # Mark as visited
                 area += 1
-                queue.append(neighbor)
+                queue.append(neighbour)
     return area
 
 
 # The evaluation heuristic function
-def evaluation_heuristic(game_state: typing.Dict) -> float:
+def evaluation_heuristic(board: Board) -> float:
     """
     Defines what is considered a winning score according to some heuristics.
 
     Args:
-      game_state:
-        Information about the state space of the game.
+      board:
+        The board representation of the game state.
 
     Returns:
       A value calculated by some heuristics.
     """
-    my_snake = game_state['you']
-    my_health = my_snake['health']
-    my_head = my_snake['body'][0]
-    my_length = len(my_snake['body'])
+    my_snake = board.snakes[board.you]
+    if not my_snake.alive:
+        return DEATH_SCORE
+    my_health = my_snake.health
+    my_head = my_snake.body[0]
+    my_length = len(my_snake.body)
+    distance = board.geometry.distance[my_head]
     
     score = (my_health / 100.0) + my_length  # Base score from health and length
-    area_control_score = calculate_area_control(game_state, my_head)
-    score += area_control_score / 10.0  # Add area control score
+    # One multi-source search gives the cells every snake reaches first and their nearest food
+    territory = voronoi(board)
+    score += territory.counts[board.you] / 10.0  # Add the territory we control
     
-    # Adjust score based on proximity to other snakes
-    for snake in game_state['board']['snakes']:
-        if snake['id'] != my_snake['id']:
-            distance_to_snake = manhattan_distance(my_head, snake['body'][0])
+    # Adjust score based on the other snakes
+    for index, snake in enumerate(board.snakes):
+        if index == board.you:
+            continue
+        if not snake.alive:
+            score += KILL_SCORE  # Reward positions where an opponent has been eliminated
+            continue
+        score -= territory.counts[index] / 20.0  # Penalize the territory the opponent controls
+        if len(snake.body) >= my_length:
+            # Only snakes at least as long as ours win a head-to-head, so only they are dangerous up close
+            distance_to_snake = distance[snake.body[0]]
             score -= max(10 - distance_to_snake, 0) / 10.0  # Penalize based on closeness to other snakes
     
-    # If low on health, prioritize food more
-    if my_health < 50 and game_state['board']['food']:
-        closest_food_distance = min(manhattan_distance(my_head, food) for food in game_state['board']['food'])
-        # score += 10 / (closest_food_distance + 1)  # Increase score based on proximity to food when health is low
+    # If low on health, prioritize the food we can reach before anyone else
+    closest_food_distance = territory.food_distances[board.you]
+    if my_health < 50 and closest_food_distance is not None:
         # Adjust scoring for health urgency
         if my_health < 15:  # Increase urgency
             score += 20 / (closest_food_distance + 1)  # Much more aggressive towards food when health is critically low
@@ -194,62 +254,273 @@ def evaluation_heuristic(game_state: typing.Dict) -> float:
     return score
 
 
-def minimax(game_state: typing.Dict, depth: int, alpha: float=NEGATIVE_INFINITY, beta: float=POSITIVE_INFINITY, maximizing_player: bool=True) -> typing.Tuple[float, str | None]:
+def _record_cutoff(board: Board, move: str, head: int, maximizing_player: bool, depth: int, orderer: MoveOrderer | None, stats: SearchStats | None):
+    """
+    Counts a cutoff and lets the move orderer learn from it.
+
+    Args:
+      board:
+        The board representation of the game state.
+      move:
+        The move that caused the cutoff.
+      head:
+        The head cell the move was made from.
+      maximizing_player:
+        The player that made the move.
+      depth:
+        The remaining depth at the node.
+      orderer:
+        Optional move orderer.
+      stats:
+        Optional search counters.
+    """
+    if stats is not None:
+        stats.cutoffs += 1
+    if orderer is not None:
+        orderer.record_cutoff(move, 2 * board.ply + (not maximizing_player), head, maximizing_player, depth)
+
+
+def minimax(game_state: typing.Dict | Board, depth: int, alpha: float=NEGATIVE_INFINITY, beta: float=POSITIVE_INFINITY, maximizing_player: bool=True, deadline: float | None=None, table: TranspositionTable | None=None, orderer: MoveOrderer | None=None, stats: SearchStats | None=None, my_move: str | None=None, stop: threading.Event | None=None) -> typing.Tuple[float, str | tuple | None]:
     """
-    An adversarial search algorithm that tries to maximize a score while assuming that an opposing agent is
+    An adversarial search algorithm that tries to maximize a score while assuming that the opponents are
     trying to minimize the score. Utilized alpha-beta pruning for efficiency.
 
+    Every turn is searched as two plies: the maximizing player picks our move, then the minimizing player
+    picks a move for every opponent knowing ours, and the turn is resolved with all moves applied at once.
+
     Args:
       game_state:
-        Information about the state space of the game.
+        Information about the state space of the game, or a board built from it.
       depth:
-        The depth of the search tree.
+        The depth of the search tree, in turns.
       maximizing_player:
         The player doing the maximizing.
+      deadline:
+        Optional ``time.perf_counter()`` value after which SearchTimeout is raised.
+      table:
+        Optional transposition table to look positions up in and store results to.
+      orderer:
+        Optional move orderer; without one moves are searched in the fixed MOVES order.
+      stats:
+        Optional counters for visited nodes and cutoffs.
+      my_move:
+        Our move chosen by the maximizing player; required when ``maximizing_player`` is False.
+      stop:
+        Optional event that raises SearchTimeout once set, to cancel the search from another thread.
 
     Returns:
-      The best move and its associated value.
+      The best move and its associated value. For the minimizing player the move is a tuple of opponent moves.
     """
+    # Build the board once at the root; deeper calls make and unmake moves on it in place
+    if isinstance(game_state, Board):
+        board = game_state
+    else:
+        board = Board.from_game_state(game_state)
+
+    if deadline is not None and time.perf_counter() >= deadline:
+        raise SearchTimeout
+    if stop is not None and stop.is_set():
+        raise SearchTimeout
+    if stats is not None:
+        stats.nodes += 1
+
+    # Look the position up in the transposition table; a deep enough entry may settle it right away
+    alpha_original, beta_original = alpha, beta
+    key = 0
+    tt_move = None
+    if table is not None:
+        key = board.key if maximizing_player else board.key ^ MINIMIZING_KEY ^ MOVE_KEYS[my_move]
+        entry = table.probe(key)
+        if entry is not None:
+            tt_move = entry[4]
+        if entry is not None and entry[1] >= depth:
+            _, _, entry_value, bound, entry_move, _ = entry
+            if bound == EXACT:
+                return entry_value, entry_move
+            if bound == LOWER_BOUND:
+                alpha = max(alpha, entry_value)
+            else:
+                beta = min(beta, entry_value)
+            if alpha >= beta:
+                return entry_value, entry_move
+
     # Base case: if we've reached the maximum depth or the game is over, evaluate the game state
-    if depth == 0 or is_terminal(game_state):
-        return evaluation_heuristic(game_state), None
+    if maximizing_player and (depth == 0 or board.is_terminal()):
+        if stats is not None and stats.timed:
+            started = time.perf_counter()
+            value = evaluation_heuristic(board)
+            stats.eval_time += time.perf_counter() - started
+            stats.evaluations += 1
+        else:
+            value = evaluation_heuristic(board)
+        if table is not None:
+            table.store(key, depth, value, EXACT, None)
+        return value, None
+
+    # Search the most promising moves first so that cutoffs come early
+    head = board.snakes[board.you].body[0]
+    if maximizing_player:
+        moves = get_safe_moves(board)
+    else:
+        moves = get_opponent_moves(board, depth)
+    if orderer is not None:
+        moves = orderer.order(moves, 2 * board.ply + (not maximizing_player), tt_move, head, maximizing_player)
+
     if maximizing_player:
         # Initialize the best value to the lowest possible number
         value = NEGATIVE_INFINITY
         # Initialize the best move to None
         best_move = None
         # Explore all possible safe moves for the maximizing player 
-        for move_option in get_safe_moves(game_state):
-            # Apply the move to get a new game state
-            new_state = apply_move(game_state, move_option)
-            # Recursively call minimax for the new state, decreasing the depth
-            new_value, _ = minimax(new_state, depth-1, alpha, beta, False)
+        for move_option in moves:
+            # Let the opponents answer the move; the turn is only applied once their moves are known
+            new_value, _ = minimax(board, depth, alpha, beta, False, deadline, table, orderer, stats, move_option, stop)
             # Update the best value - maximum and move if the new value is better
-            if new_value > value:
+            if best_move is None or new_value > value:
                 value, best_move = new_value, move_option
             alpha = max(alpha, value)
             if alpha >= beta:
+                _record_cutoff(board, move_option, head, True, depth, orderer, stats)
                 break # Beta cutoff
-        
-        # Return the best value and move found for the maximizing player
-        return value, best_move
     else:
         # Initialize the best value to the highest possible number
         value = POSITIVE_INFINITY
         # Initialize the best move to None
         best_move = None
-        # Explore all possible safe moves for the minimizing player
-        for move_option in get_safe_moves(game_state):
-            # Apply the move to get a new game state
-            new_state = apply_move(game_state, move_option)
+        # Explore all combinations of opponent moves for the minimizing player
+        # The leaves are scored one by one rather than batched like in minimax_a_star: opponents more than
+        # two moves away only get one move, so one move above the leaves a turn has about three answers in
+        # all, and the cutoffs skip a third to a half of them. A batch would score every one of them.
+        for move_option in moves:
+            # Apply everyone's moves to the board as one turn
+            turn_moves = list(move_option)
+            turn_moves[board.you] = my_move
+            board.make_move(turn_moves)
             # Recursively call minimax for the new state, decreasing the depth
-            new_value, _ = minimax(new_state, depth-1, alpha, beta, True)
+            new_value, _ = minimax(board, depth-1, alpha, beta, True, deadline, table, orderer, stats, stop=stop)
+            # Take the turn back before trying the next one
+            board.unmake_move()
             # Update the best value - minimum and move if the new valued is better for the minimizing player
             if new_value < value:
                 value, best_move = new_value, move_option
             beta = min(beta, value)
             if beta <=alpha:
+                _record_cutoff(board, move_option, head, False, depth, orderer, stats)
                 break # Alpha cutoff
-        
-        # Return the best value and move found for the minimizing player
-        return value, best_move
+
+    # Remember the result, noting whether it is exact or only a bound because of a cutoff
+    if table is not None:
+        if value <= alpha_original:
+            table.store(key, depth, value, UPPER_BOUND, best_move)
+        elif value >= beta_original:
+            table.store(key, depth, value, LOWER_BOUND, best_move)
+        else:
+            table.store(key, depth, value, EXACT, best_move)
+
+    # Return the best value and move found
+    return value, best_move
+
+
+def iterative_deepening(game_state: typing.Dict | Board, deadline: float, max_depth: int=MAX_SEARCH_DEPTH, table: TranspositionTable | None=None, orderer: MoveOrderer | None=None, stats: SearchStats | None=None, stop: threading.Event | None=None, root_moves: typing.Sequence[str] | None=None) -> typing.Tuple[float, str | None, int]:
+    """
+    Anytime search: runs minimax at increasing depths until the deadline and keeps the result of the
+    deepest search that finished. The first iteration always runs to completion so a move is always found.
+
+    Args:
+      game_state:
+        Information about the state space of the game, or a board built from it.
+      deadline:
+        The ``time.perf_counter()`` value by which the search must return.
+      max_depth:
+        The deepest search to attempt.
+      table:
+        Transposition table shared by all iterations. A new one is created if not given.
+      orderer:
+        Move orderer shared by all iterations. A new one is created if not given.
+      stats:
+        Optional counters, filled with the nodes searched by every finished pass.
+      stop:
+        Optional event that ends the search once set, like the deadline, even during the first iteration.
+      root_moves:
+        Our moves to search at the root instead of every safe move, e.g. the share of one worker process.
+
+    Returns:
+      The value and move of the deepest finished search, and that depth.
+    """
+    board = game_state if isinstance(game_state, Board) else Board.from_game_state(game_state)
+    root_ply = board.ply
+    if table is None:
+        table = TranspositionTable()
+    table.new_search()
+    if orderer is None:
+        orderer = MoveOrderer()
+    orderer.new_search()
+    if stats is None:
+        stats = SearchStats()
+
+    best_value, best_move, completed_depth = NEGATIVE_INFINITY, None, 0
+    last_duration = 0.0
+    for depth in range(1, max_depth + 1):
+        started = time.perf_counter()
+        nodes_before = stats.nodes
+        # A deeper pass costs at least as much as the last one, so don't start one that cannot finish
+        if depth > 1 and started + last_duration >= deadline:
+            break
+        try:
+            if root_moves is None:
+                value, move = minimax(board, depth, deadline=deadline if depth > 1 else None, table=table, orderer=orderer, stats=stats, stop=stop)
+            else:
+                # Every given move is searched from the opponents' answer to it, whose key includes the move,
+                # so the root position itself is never stored with the value of only some of our moves
+                value, move = NEGATIVE_INFINITY, None
+                for root_move in root_moves:
+                    move_value, _ = minimax(board, depth, maximizing_player=False, deadline=deadline if depth > 1 else None, table=table, orderer=orderer, stats=stats, my_move=root_move, stop=stop)
+                    if move is None or move_value > value:
+                        value, move = move_value, root_move
+        except SearchTimeout:
+            board.rewind(root_ply)  # Take back the moves of the abandoned iteration
+            break
+        last_duration = time.perf_counter() - started
+        stats.depth_nodes.append(stats.nodes - nodes_before)
+        stats.depth_values.append(value)
+        best_value, best_move, completed_depth = value, move, depth
+        if move is None:
+            break  # No safe moves, searching deeper won't change that
+
+    return best_value, best_move, completed_depth
+
+
+def principal_variation(board: Board, table: TranspositionTable, max_turns: int=MAX_SEARCH_DEPTH) -> typing.List[typing.Tuple[str, tuple]]:
+    """
+    Follows the best moves stored in the transposition table from the current position.
+
+    Args:
+      board:
+        The board the search was run on; it is left unchanged.
+      table:
+        The transposition table filled by the search.
+      max_turns:
+        The longest line to follow.
+
+    Returns:
+      The expected line of play, one ``(our move, opponent moves)`` pair per turn.
+    """
+    line = []
+    root_ply = board.ply
+    while len(line) < max_turns:
+        entry = table.probe(board.key)
+        if entry is None or entry[4] is None:
+            break
+        my_move = entry[4]
+        entry = table.probe(board.key ^ MINIMIZING_KEY ^ MOVE_KEYS[my_move])
+        if entry is None or entry[4] is None:
+            break
+        opponent_moves = entry[4]
+        line.append((my_move, opponent_moves))
+        turn_moves = list(opponent_moves)
+        turn_moves[board.you] = my_move
+        board.make_move(turn_moves)
+        if board.is_terminal():
+            break
+    board.rewind(root_ply)
+    return line
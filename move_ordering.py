@@ -0,0 +1,88 @@
+import typing
+
+
+# Ordering scores: the transposition table move goes first, then killer moves, then the history score
+TT_MOVE_SCORE = 1 << 30
+KILLER_SCORE = 1 << 29
+
+
+class MoveOrderer:
+    """
+    Orders moves for alpha-beta search so that cutoffs happen as early as possible.
+
+    Attributes:
+      killers:
+        Per ply, the last two moves that caused a cutoff there.
+      history:
+        Cutoff score per (maximizing player, head cell, move), weighted by the remaining depth.
+    """
+
+    def __init__(self):
+        """
+        Initializes the MoveOrderer class.
+        """
+        self.killers = []
+        self.history = {}
+
+    def new_search(self):
+        """
+        Prepares for a search from a new root: killers are cleared and history scores are aged.
+        """
+        self.killers = []
+        self.history = {key: score >> 1 for key, score in self.history.items() if score > 1}
+
+    def order(self, moves: typing.List[str], ply: int, tt_move: str | None, head: int, maximizing_player: bool) -> typing.List[str]:
+        """
+        Sorts moves from most to least promising. Ties keep their original order.
+
+        Args:
+          moves:
+            The moves to order.
+          ply:
+            Distance of the node from the start of the board history.
+          tt_move:
+            The best move stored for the node in the transposition table, if any.
+          head:
+            The head cell of the moving snake.
+          maximizing_player:
+            The player to move.
+
+        Returns:
+          The moves in search order.
+        """
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history
+
+        def score(move: str) -> int:
+            if move == tt_move:
+                return TT_MOVE_SCORE
+            if move in killers:
+                return KILLER_SCORE
+            return history.get((maximizing_player, head, move), 0)
+
+        return sorted(moves, key=score, reverse=True)
+
+    def record_cutoff(self, move: str, ply: int, head: int, maximizing_player: bool, depth: int):
+        """
+        Remembers a move that caused a cutoff.
+
+        Args:
+          move:
+            The move that caused the cutoff.
+          ply:
+            Distance of the node from the start of the board history.
+          head:
+            The head cell of the moving snake.
+          maximizing_player:
+            The player to move.
+          depth:
+            The remaining depth at the node.
+        """
+        while len(self.killers) <= ply:
+            self.killers.append([None, None])
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        key = (maximizing_player, head, move)
+        self.history[key] = self.history.get(key, 0) + depth * depth
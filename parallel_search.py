@@ -0,0 +1,125 @@
+import multiprocessing.util
+import os
+import time
+import typing
+
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board
+from minimax_search import iterative_deepening, get_safe_moves, SearchStats, MAX_SEARCH_DEPTH, NEGATIVE_INFINITY
+from transposition import TranspositionTable
+
+
+# Number of processes the root moves are split across; main searches in its own process with 0 or 1
+SEARCH_WORKERS = int(os.environ.get("SEARCH_WORKERS", "0"))
+
+# Transposition table of a worker process, kept between calls so the next turn finds earlier positions. It is
+# shared by every game and snake the worker searches for; the key of a position includes which snake is ours
+_table = None
+# Pool of every worker count asked for, created on first use
+_executors: typing.Dict[int, ProcessPoolExecutor] = {}
+
+
+def _executor(workers: int) -> ProcessPoolExecutor:
+    """
+    Gets the process pool with a given number of workers, starting it on first use.
+
+    Args:
+      workers:
+        Number of worker processes.
+
+    Returns:
+      The pool.
+    """
+    executor = _executors.get(workers)
+    if executor is None:
+        if not _executors:
+            # Inside a server worker process, exiting waits for child processes, so stop the pools first,
+            # ahead of the finalizers that close their queues
+            multiprocessing.util.Finalize(None, _shutdown_executors, args=(os.getpid(),), exitpriority=100)
+        executor = _executors[workers] = ProcessPoolExecutor(max_workers=workers)
+    return executor
+
+
+def _shutdown_executors(pid: int):
+    """
+    Stops every process pool.
+
+    Args:
+      pid:
+        The process that started the pools; forked children inherit the pools but must leave them alone.
+    """
+    if os.getpid() != pid:
+        return
+    for executor in _executors.values():
+        executor.shutdown(cancel_futures=True)
+    _executors.clear()
+
+
+def search_root_move(game_state: typing.Dict, move: str, wall_deadline: float, max_depth: int=MAX_SEARCH_DEPTH) -> typing.Tuple[typing.List[float], int]:
+    """
+    Iterative deepening below one of our root moves, run in a worker process.
+
+    Args:
+      game_state:
+        Information about the state space of the game.
+      move:
+        Our move at the root.
+      wall_deadline:
+        The ``time.time()`` value by which the search must return; wall-clock time is shared by all processes.
+      max_depth:
+        The deepest search to attempt.
+
+    Returns:
+      The value of the move after every finished depth (the first after depth 1) and the nodes searched.
+    """
+    global _table
+    if _table is None:
+        _table = TranspositionTable()
+    deadline = time.perf_counter() + wall_deadline - time.time()
+
+    stats = SearchStats()
+    iterative_deepening(game_state, deadline, max_depth, table=_table, stats=stats, root_moves=[move])
+    return stats.depth_values, stats.nodes
+
+
+def parallel_search(game_state: typing.Dict, deadline: float, workers: int=SEARCH_WORKERS, max_depth: int=MAX_SEARCH_DEPTH, stats: SearchStats | None=None) -> typing.Tuple[float, str | None, int]:
+    """
+    Root-parallel search: every safe root move is searched by iterative deepening in its own worker process.
+
+    Results are merged at the deepest depth every move finished, so the outcome only depends on which depths
+    were reached. The best value wins, and ties go to the move that comes first in MOVES order.
+
+    Args:
+      game_state:
+        Information about the state space of the game.
+      deadline:
+        The ``time.perf_counter()`` value by which the search must return.
+      workers:
+        Number of worker processes. With more root moves than workers, moves queue for a free worker.
+      max_depth:
+        The deepest search to attempt.
+      stats:
+        Optional counters, filled with the nodes searched by all workers.
+
+    Returns:
+      The value and move of the merged search, and its depth.
+    """
+    board = Board.from_game_state(game_state)
+    moves = get_safe_moves(board)
+    if not moves:
+        return NEGATIVE_INFINITY, None, 0
+
+    wall_deadline = time.time() + deadline - time.perf_counter()
+    executor = _executor(max(workers, 1))
+    futures = [executor.submit(search_root_move, game_state, move, wall_deadline, max_depth) for move in moves]
+    results = [future.result() for future in futures]
+
+    depth = min(len(values) for values, _ in results)
+    if stats is not None:
+        stats.nodes += sum(nodes for _, nodes in results)
+    best_value, best_move = NEGATIVE_INFINITY, None
+    for move, (values, _) in zip(moves, results):
+        if best_move is None or values[depth - 1] > best_value:
+            best_value, best_move = values[depth - 1], move
+    return best_value, best_move, depth
@@ -0,0 +1,96 @@
+# Dict game states made during a search are persistent: a child is never built by changing its parent in
+# place. Every helper below returns new dicts and lists for the parts that change, down the path from the
+# state to the change, and shares everything else with the parent. Siblings can therefore never see each
+# other's changes, and a list shared by two states (found by ``is``/``id()``) holds the same points in both.
+#
+# Points (``{'x': ..., 'y': ...}``), bodies, food lists and snake lists reachable from a state are read-only
+# once the state exists; code that needs a changed one makes a new one with these helpers.
+
+import typing
+
+from geometry import MOVE_DELTAS
+
+
+def assoc(mapping: typing.Dict, key: str, value) -> typing.Dict:
+    """
+    Copies a dict with one key set, sharing every other value.
+
+    Args:
+      mapping:
+        The dict to copy; it is left unchanged.
+      key:
+        The key to set.
+      value:
+        Its new value.
+
+    Returns:
+      The new dict.
+    """
+    copy = mapping.copy()
+    copy[key] = value
+    return copy
+
+
+def move_snake(snake: typing.Dict, move: str, grow: bool = False) -> typing.Dict:
+    """
+    Moves a snake one cell. The new body is a new head followed by the old segments, which are shared.
+
+    Args:
+      snake:
+        The snake to move; it is left unchanged.
+      move:
+        The direction to move in.
+      grow:
+        True to keep the tail, as after eating.
+
+    Returns:
+      The moved snake, with ``head`` and ``length`` updated if the snake has them.
+    """
+    body = snake['body']
+    dx, dy = MOVE_DELTAS[move]
+    head = {'x': body[0]['x'] + dx, 'y': body[0]['y'] + dy}
+    moved = snake.copy()
+    moved['body'] = [head] + (body if grow else body[:-1])
+    if 'head' in snake:
+        moved['head'] = head
+    if 'length' in snake:
+        moved['length'] = len(moved['body'])
+    return moved
+
+
+def with_you(game_state: typing.Dict, you: typing.Dict) -> typing.Dict:
+    """
+    Replaces our snake in ``you``, sharing the board.
+
+    The copy of our snake in ``board['snakes']`` is left as it was, like the search has always done.
+
+    Args:
+      game_state:
+        The state to copy; it is left unchanged.
+      you:
+        Our new snake.
+
+    Returns:
+      The new state.
+    """
+    return assoc(game_state, 'you', you)
+
+
+def without_food(game_state: typing.Dict, point: typing.Dict) -> typing.Dict:
+    """
+    Removes the food at a point, as when a snake eats it. Only the food list and the board are copied.
+
+    Args:
+      game_state:
+        The state to copy; it is left unchanged.
+      point:
+        The position of the food.
+
+    Returns:
+      The new state, or the state itself if there is no food at the point.
+    """
+    food = game_state['board']['food']
+    remaining = [item for item in food if item['x'] != point['x'] or item['y'] != point['y']]
+    if len(remaining) == len(food):
+        return game_state
+    return assoc(game_state, 'board', assoc(game_state['board'], 'food', remaining))
@@ -0,0 +1,117 @@
+import threading
+import typing
+
+from board import Board
+from minimax_search import iterative_deepening, SearchStats
+from move_ordering import MoveOrderer
+from transposition import TranspositionTable
+
+
+# Ponderers with a thread started, so that a move of any game can stop them all
+_pondering = set()
+_pondering_lock = threading.Lock()
+
+
+def stop_pondering():
+    """
+    Cancels every pondering search of the process, e.g. when a move request arrives: pondering competes for
+    the interpreter with the search that must answer in time. The pondered keys are kept for ``stop``.
+    """
+    with _pondering_lock:
+        ponderers = list(_pondering)
+    for ponderer in ponderers:
+        ponderer.cancel()
+
+
+class Ponderer:
+    """
+    Searches the position expected next turn in a background thread while the opponents think.
+
+    The results land in the game's transposition table, so if the opponents play the predicted moves the
+    next search finds the pondered subtree already searched. The search is cancelled as soon as the next
+    move request of any game arrives, whether the prediction was right or not.
+
+    Attributes:
+      key:
+        Zobrist key of the position being pondered, or None.
+      depth:
+        Deepest iteration the pondering finished.
+      stats:
+        Counters of the pondering search.
+    """
+
+    def __init__(self):
+        """
+        Initializes the Ponderer class.
+        """
+        self.key = None
+        self.depth = 0
+        self.stats = SearchStats()
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self, board: Board, turn: typing.Tuple[str, tuple], table: TranspositionTable, deadline: float):
+        """
+        Starts pondering the position reached by one turn of the principal variation.
+
+        Args:
+          board:
+            The board of the current turn; it is left unchanged.
+          turn:
+            Our move and the opponent moves of the first turn of the principal variation.
+          table:
+            The transposition table of the game. It must not be used by another search until ``stop``.
+          deadline:
+            The ``time.perf_counter()`` value after which pondering gives up on its own.
+        """
+        self.stop()
+        my_move, opponent_moves = turn
+        turn_moves = list(opponent_moves)
+        turn_moves[board.you] = my_move
+        board.make_move(turn_moves)
+        # A board of its own, built like the next request's so that eliminated snakes are dropped the same way
+        predicted = Board.from_game_state(board.to_game_state())
+        board.unmake_move()
+        if predicted.is_terminal():
+            return
+
+        self.key = predicted.key
+        self.depth = 0
+        self.stats = SearchStats()
+        self._stop = threading.Event()
+        with self._lock:
+            self._thread = threading.Thread(target=self._run, args=(predicted, table, deadline, self._stop), daemon=True)
+            self._thread.start()
+        with _pondering_lock:
+            _pondering.add(self)
+
+    def _run(self, board: Board, table: TranspositionTable, deadline: float, stop: threading.Event):
+        """
+        Body of the pondering thread.
+        """
+        _, _, self.depth = iterative_deepening(board, deadline, table=table, orderer=MoveOrderer(), stats=self.stats, stop=stop)
+
+    def cancel(self):
+        """
+        Cancels pondering and waits for the thread to finish, keeping the key of the pondered position.
+        """
+        with self._lock:
+            if self._thread is None:
+                return
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        with _pondering_lock:
+            _pondering.discard(self)
+
+    def stop(self) -> int | None:
+        """
+        Cancels pondering and waits for the thread to finish.
+
+        Returns:
+          Zobrist key of the position that was pondered, or None if there was none.
+        """
+        self.cancel()
+        key, self.key = self.key, None
+        return key
@@ -0,0 +1,130 @@
+"""
+Profiles the search of single moves with cProfile and summarizes the saved profiles.
+
+The server profiles one move in PROFILE_EVERY (0, the default, never), and any /move request sent as
+/move?profile=1. Profiles are saved to PROFILE_DIR as <game id>-<turn>.prof. To find the hot functions:
+  python profiling.py [profiles/*.prof] [--sort tottime] [--limit 30]
+"""
+
+import argparse
+import contextlib
+import cProfile
+import glob
+import os
+import pstats
+import re
+import threading
+import typing
+
+
+# Directory the profiles are saved to
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+# Profile one move in this many; 0 profiles only the moves that ask for it
+PROFILE_EVERY = int(os.environ.get("PROFILE_EVERY", "0"))
+
+
+class MoveProfiler:
+    """
+    Runs cProfile around the search of sampled or requested moves.
+
+    Only the thread that searches is profiled: the ponder thread and the processes of a parallel search are not.
+
+    Attributes:
+      directory:
+        Directory the profiles are saved to.
+      every:
+        Profile one move in this many, or 0 for requested moves only.
+      moves:
+        Number of moves seen.
+      profiled:
+        Number of profiles saved.
+    """
+
+    def __init__(self, directory: str = PROFILE_DIR, every: int = PROFILE_EVERY):
+        """
+        Initializes the MoveProfiler class.
+
+        Args:
+          directory:
+            Directory the profiles are saved to, created on the first profile.
+          every:
+            Profile one move in this many, or 0 for requested moves only.
+        """
+        self.directory = directory
+        self.every = every
+        self.moves = 0
+        self.profiled = 0
+        self._lock = threading.Lock()
+
+    def wanted(self, game_state: typing.Dict) -> bool:
+        """
+        Counts a move and tells whether it is profiled: it asked to be, or it is the sampled one.
+        """
+        with self._lock:
+            self.moves += 1
+            return bool(game_state.get("profile")) or (self.every > 0 and self.moves % self.every == 0)
+
+    @contextlib.contextmanager
+    def profile(self, game_state: typing.Dict):
+        """
+        Profiles the body of the with statement if the move is profiled, and saves the profile.
+
+        Args:
+          game_state:
+            The game state of the move; its game id and turn name the profile.
+
+        Yields:
+          The path the profile is saved to, or None if the move isn't profiled.
+        """
+        if not self.wanted(game_state):
+            yield None
+            return
+        game_id = re.sub(r"[^\w.-]", "_", game_state.get("game", {}).get("id", "") or "game")
+        path = os.path.join(self.directory, f"{game_id}-{game_state.get('turn', 0):04d}.prof")
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield path
+        finally:
+            profiler.disable()
+            os.makedirs(self.directory, exist_ok=True)
+            profiler.dump_stats(path)
+            self.profiled += 1
+
+
+def summarize(paths: typing.List[str], sort: str = "tottime", limit: int = 30) -> pstats.Stats:
+    """
+    Adds up saved profiles and prints their hottest functions.
+
+    Args:
+      paths:
+        The profile files.
+      sort:
+        A pstats sort key, e.g. ``tottime`` (time in the function itself) or ``cumulative``.
+      limit:
+        Number of functions printed.
+
+    Returns:
+      The combined statistics.
+    """
+    stats = pstats.Stats(*paths)
+    stats.strip_dirs().sort_stats(sort)
+    stats.print_stats(limit)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help=f"profile files, all of {PROFILE_DIR}/ by default")
+    parser.add_argument("--sort", default="tottime", help="pstats sort key, e.g. tottime, cumulative or ncalls")
+    parser.add_argument("--limit", type=int, default=30, help="number of functions shown")
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(glob.glob(os.path.join(PROFILE_DIR, "*.prof")))
+    if not paths:
+        parser.error(f"no profiles in {PROFILE_DIR}/")
+    summarize(paths, args.sort, args.limit)
+
+
+if __name__ == "__main__":
+    main()
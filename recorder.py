@@ -0,0 +1,153 @@
+import glob
+import gzip
+import os
+import queue
+import threading
+import time
+import zlib
+
+from json_codec import loads, dumps
+
+
+# Directory to record request bodies to; recording is off unless it is set
+RECORD_DIR = os.environ.get("RECORD_DIR")
+# Fraction of games recorded, chosen by game id so that sampled games are recorded whole
+RECORD_SAMPLE_RATE = float(os.environ.get("RECORD_SAMPLE_RATE", "1"))
+# Compressed size at which a file is closed and a new one started, and the size all files may take together
+RECORD_MAX_FILE_MB = float(os.environ.get("RECORD_MAX_FILE_MB", "64"))
+RECORD_MAX_TOTAL_MB = float(os.environ.get("RECORD_MAX_TOTAL_MB", "1024"))
+# Bodies waiting to be written; requests arriving while the queue is full are not recorded
+RECORD_QUEUE_SIZE = 10000
+
+
+class Recorder:
+    """
+    Appends request bodies to rotating gzip-compressed JSONL files from a background thread.
+
+    Every line is ``{"path": ..., "time": ..., "body": ...}`` with the body as received, the format
+    ``benchmarks.replay`` reads. Requests only pay for a queue put; a full queue drops the body rather than
+    waiting. Once the files take more than the total cap, the oldest ones are deleted.
+
+    Attributes:
+      directory:
+        Directory of the files.
+      sample_rate:
+        Fraction of games recorded.
+      max_file_bytes:
+        Compressed size at which a new file is started.
+      max_total_bytes:
+        Size all files may take together.
+      recorded:
+        Number of bodies written.
+      dropped:
+        Number of bodies dropped because the queue was full.
+    """
+
+    def __init__(self, directory: str, sample_rate: float = RECORD_SAMPLE_RATE,
+                 max_file_bytes: float = RECORD_MAX_FILE_MB * 1024 * 1024,
+                 max_total_bytes: float = RECORD_MAX_TOTAL_MB * 1024 * 1024, queue_size: int = RECORD_QUEUE_SIZE):
+        """
+        Starts the writer thread.
+
+        Args:
+          directory:
+            Directory of the files, created if missing.
+          sample_rate:
+            Fraction of games recorded.
+          max_file_bytes:
+            Compressed size at which a new file is started.
+          max_total_bytes:
+            Size all files may take together.
+          queue_size:
+            Number of bodies that may wait to be written.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_file_bytes = max_file_bytes
+        self.max_total_bytes = max_total_bytes
+        self.recorded = 0
+        self.dropped = 0
+        self._queue = queue.Queue(queue_size)
+        self._raw = None
+        self._file = None
+        self._sequence = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls) -> 'Recorder | None':
+        """
+        Creates the recorder configured by the environment, or None if recording is off.
+        """
+        return cls(RECORD_DIR) if RECORD_DIR else None
+
+    def record(self, path: str, game_id: str, body: bytes):
+        """
+        Queues a request body to be written, if its game is sampled.
+
+        Args:
+          path:
+            The request path, e.g. ``/move``.
+          game_id:
+            The game id from the body.
+          body:
+            The raw request body.
+        """
+        if self.sample_rate < 1 and zlib.crc32(game_id.encode()) / 0xFFFFFFFF >= self.sample_rate:
+            return
+        try:
+            self._queue.put_nowait((path, time.time(), body))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """
+        Writes every queued body and closes the current file.
+        """
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        """
+        Body of the writer thread.
+        """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            path, received, body = item
+            # Bodies are embedded as they are, unless they span lines
+            if b"\n" in body:
+                body = dumps(loads(body))
+            self._write(b'{"path":' + dumps(path) + b',"time":' + dumps(received) + b',"body":' + body + b'}\n')
+            self.recorded += 1
+        if self._file is not None:
+            self._file.close()
+            self._raw.close()
+
+    def _write(self, line: bytes):
+        """
+        Appends a line, starting a new file once the current one is full.
+        """
+        if self._file is None or self._raw.tell() >= self.max_file_bytes:
+            self._rotate()
+        self._file.write(line)
+
+    def _rotate(self):
+        """
+        Closes the current file, deletes the oldest files beyond the total cap and opens a new file.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._raw.close()
+        files = sorted(glob.glob(os.path.join(self.directory, "requests-*.jsonl.gz")), key=os.path.getmtime)
+        total = sum(os.path.getsize(name) for name in files)
+        # Leave room for the new file
+        while files and total + self.max_file_bytes > self.max_total_bytes:
+            total -= os.path.getsize(files[0])
+            os.remove(files.pop(0))
+        self._sequence += 1
+        name = os.path.join(self.directory, f"requests-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._sequence}.jsonl.gz")
+        self._raw = open(name, "wb")
+        self._file = gzip.GzipFile(fileobj=self._raw, mode="wb")
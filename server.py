@@ -1,35 +1,232 @@
 import logging
 import os
+import signal
+import threading
+import time
 import typing
 
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 from flask import Flask
+from flask import Response
 from flask import request
+from werkzeug.serving import make_server
+
+from json_codec import loads, dumps
+from metrics import MoveMetrics
+from recorder import Recorder
+
+
+# Serving modes: Flask's development server, or a threaded front end that runs the handlers in worker processes
+DEVELOPMENT = "development"
+PRODUCTION = "production"
+# Seconds without a request after which a game is forgotten by the front end (games whose /end never arrives),
+# the same setting as for the sessions the handlers keep
+GAME_IDLE_TIMEOUT = float(os.environ.get("SESSION_IDLE_TIMEOUT", "60"))
+
+
+class GameWorkers:
+    """
+    Worker processes that run the game handlers for the production server.
+
+    Every game is pinned to one worker for its whole length, so anything a handler keeps between turns
+    stays in one process. A game seen for the first time, at /start or mid-game after a restart, goes to
+    the worker with the fewest games. Games are forgotten at /end, or once idle for too long. A worker that
+    dies (out of memory, a crash) is replaced by a new process, which its games continue on from scratch.
+
+    Attributes:
+      workers:
+        Number of worker processes.
+      idle_timeout:
+        Seconds without a request after which a game is forgotten.
+    """
+
+    def __init__(self, workers: int, idle_timeout: float = GAME_IDLE_TIMEOUT):
+        """
+        Starts the worker processes.
+
+        Args:
+          workers:
+            Number of worker processes.
+          idle_timeout:
+            Seconds without a request after which a game is forgotten.
+        """
+        self.workers = workers
+        self.idle_timeout = idle_timeout
+        self._pools = [ProcessPoolExecutor(max_workers=1) for _ in range(workers)]
+        self._games = {}
+        self._last_used = {}
+        self._load = [0] * workers
+        self._lock = threading.Lock()
+        # Start every process now rather than on the first move of its first game
+        for future in [pool.submit(int) for pool in self._pools]:
+            future.result()
+
+    def _worker(self, game_id: str) -> int:
+        """
+        Picks the worker of a game, and forgets the games that have been idle for too long.
+
+        Args:
+          game_id:
+            The game id from the game state.
+
+        Returns:
+          Index of the worker.
+        """
+        with self._lock:
+            now = time.monotonic()
+            for idle_game in [idle_game for idle_game, last_used in self._last_used.items()
+                              if now - last_used > self.idle_timeout and idle_game != game_id]:
+                self._forget(idle_game)
+            worker = self._games.get(game_id)
+            if worker is None:
+                worker = self._games[game_id] = min(range(self.workers), key=self._load.__getitem__)
+                self._load[worker] += 1
+            self._last_used[game_id] = now
+            return worker
+
+    def _forget(self, game_id: str):
+        """
+        Drops a game from the placement; the caller holds the lock.
+        """
+        worker = self._games.pop(game_id, None)
+        if worker is not None:
+            del self._last_used[game_id]
+            self._load[worker] -= 1
+
+    def _replace(self, worker: int, pool: ProcessPoolExecutor):
+        """
+        Starts a new process for a worker whose process died, unless another request already did.
+        """
+        with self._lock:
+            if self._pools[worker] is not pool:
+                return
+            print(f"Worker {worker} died, starting a new one")
+            self._pools[worker] = ProcessPoolExecutor(max_workers=1)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, handler: typing.Callable, game_state: typing.Dict, end: bool = False,
+            fallback: typing.Callable | None = None):
+        """
+        Runs a handler in the worker of its game and waits for the result.
+
+        Args:
+          handler:
+            A module-level handler function, so that it can be sent to another process.
+          game_state:
+            Information about the state space of the game.
+          end:
+            True for /end, after which the game is forgotten.
+          fallback:
+            Called with the game state in this process when the worker died before answering, or None.
+
+        Returns:
+          What the handler returned, or else what the fallback returned.
+        """
+        game_id = game_state.get("game", {}).get("id", "")
+        worker = self._worker(game_id)
+        pool = self._pools[worker]
+        try:
+            return pool.submit(handler, game_state).result()
+        except BrokenProcessPool:
+            self._replace(worker, pool)
+            return fallback(game_state) if fallback is not None else None
+        finally:
+            if end:
+                with self._lock:
+                    self._forget(game_id)
+
+    def shutdown(self):
+        """
+        Stops the worker processes.
+        """
+        for pool in self._pools:
+            pool.shutdown(cancel_futures=True)
 
 
 def run_server(handlers: typing.Dict):
+    """
+    Serves the Battlesnake API.
+
+    The mode, bind address and worker count come from the ``SERVER_MODE``, ``HOST`` and ``WORKERS``
+    environment variables, or else from the ``server_mode``, ``host`` and ``workers`` entries of
+    ``handlers``. The development mode runs Flask's debug server on localhost. The production mode answers
+    requests on threads and runs the handlers in one process per worker, so concurrent games search on
+    separate cores.
+
+    Args:
+      handlers:
+        The ``info``, ``start``, ``move`` and ``end`` functions, and optionally ``port``, ``host``,
+        ``server_mode``, ``workers`` and ``fallback``, a quick move for when a worker dies during a move.
+    """
+    mode = os.environ.get("SERVER_MODE", handlers.get("server_mode", DEVELOPMENT))
+    if mode not in (DEVELOPMENT, PRODUCTION):
+        raise ValueError(f"Unknown server mode {mode!r}, expected {DEVELOPMENT!r} or {PRODUCTION!r}")
+
+    workers = None
+    if mode == PRODUCTION:
+        workers = GameWorkers(int(os.environ.get("WORKERS", handlers.get("workers", os.cpu_count() or 1))))
+
+    def run(name: str, game_state: typing.Dict):
+        if workers is None:
+            return handlers[name](game_state)
+        return workers.run(handlers[name], game_state, end=name == "end",
+                           fallback=handlers.get("fallback") if name == "move" else None)
+
+    metrics = MoveMetrics()
+    # Opt-in capture of the request bodies (RECORD_DIR), written by a background thread
+    recorder = Recorder.from_env()
+
+    def decode(path: str) -> typing.Dict:
+        body = request.get_data()
+        game_state = loads(body)
+        if recorder is not None:
+            recorder.record(path, game_state.get("game", {}).get("id", ""), body)
+        return game_state
+
     app = Flask("Battlesnake")
 
     @app.get("/")
     def on_info():
         return handlers["info"]()
 
+    # Bodies are decoded with the fastest JSON library available instead of Flask's get_json
     @app.post("/start")
     def on_start():
-        game_state = request.get_json()
-        handlers["start"](game_state)
+        game_state = decode("/start")
+        run("start", game_state)
         return "ok"
 
     @app.post("/move")
     def on_move():
-        game_state = request.get_json()
-        return handlers["move"](game_state)
+        started = time.perf_counter()
+        # The handler counts its time budget from here, so time spent queued for a worker is not searched away
+        received = time.time()
+        game_state = decode("/move")
+        decoded = time.perf_counter()
+        game_state["received_at"] = received
+        # /move?profile=1 asks the handler to profile this move
+        if request.args.get("profile"):
+            game_state["profile"] = True
+        response = run("move", game_state)
+        # The handler adds its measurements to the response when metrics are on
+        sample = response.pop("metrics", None)
+        if sample is not None:
+            sample["decode_ms"] = (decoded - started) * 1000
+            metrics.record(sample)
+        return Response(dumps(response), mimetype="application/json")
 
     @app.post("/end")
     def on_end():
-        game_state = request.get_json()
-        handlers["end"](game_state) 
+        game_state = decode("/end")
+        run("end", game_state)
         return "ok"
 
+    @app.get("/metrics")
+    def on_metrics():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
     @app.after_request
     def identify_server(response):
         response.headers.set(
@@ -37,15 +234,31 @@ def run_server(handlers: typing.Dict):
         )
         return response
 
-    # Run on official server
-    # host = "0.0.0.0"
-    # port = int(os.environ.get("PORT", "8000"))
-
-    # Run on localhost
-    host = "localhost"
+    # Run on official server in production mode, on localhost otherwise
+    host = os.environ.get("HOST", handlers.get("host", "0.0.0.0" if mode == PRODUCTION else "localhost"))
     port = int(os.environ.get("PORT", handlers["port"] if "port" in handlers else "8000"))
 
     logging.getLogger("werkzeug").setLevel(logging.ERROR)
 
-    print(f"\nRunning Battlesnake at http://{host}:{port}")
-    app.run(host=host, port=port, debug=True)
+    if workers is None:
+        print(f"\nRunning Battlesnake at http://{host}:{port}")
+        try:
+            app.run(host=host, port=port, debug=True)
+        finally:
+            if recorder is not None:
+                recorder.close()
+        return
+
+    print(f"\nRunning Battlesnake at http://{host}:{port} with {workers.workers} workers")
+    server = make_server(host, port, app, threaded=True)
+    # Stop on SIGTERM (e.g. docker stop) the same way as on Ctrl-C, so that the recordings are flushed
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        workers.shutdown()
+        if recorder is not None:
+            recorder.close()
@@ -0,0 +1,195 @@
+import os
+import threading
+import time
+import typing
+
+from board import Board
+from mcts import SearchTree
+from move_ordering import MoveOrderer
+from pondering import Ponderer
+from transposition import TranspositionTable
+
+
+# Seconds without a request after which a game's session is dropped (games whose /end never arrives)
+SESSION_IDLE_TIMEOUT = float(os.environ.get("SESSION_IDLE_TIMEOUT", "60"))
+# Estimated memory all sessions together may use, in MB; the least recently used sessions are dropped beyond it
+SESSION_MEMORY_LIMIT_MB = float(os.environ.get("SESSION_MEMORY_LIMIT_MB", "512"))
+# Rough size of a stored transposition table entry and of a bucket slot, in bytes
+TT_ENTRY_BYTES = 200
+TT_SLOT_BYTES = 8
+# Rough size of a node of the MCTS tree, in bytes
+MCTS_NODE_BYTES = 600
+
+
+class Session:
+    """
+    Search state kept for one game between turns.
+
+    Attributes:
+      table:
+        The transposition table, so positions searched last turn are found again.
+      orderer:
+        The killer and history tables.
+      pv:
+        The principal variation of the last search, one ``(our move, opponent moves)`` pair per turn.
+      predicted_key:
+        Zobrist key of the position expected next turn if the opponents follow the principal variation.
+      pv_hits:
+        Number of turns that started from the predicted position.
+      ponderer:
+        The background search of the predicted position.
+      tree:
+        The tree of the MCTS engine.
+      last_used:
+        ``time.monotonic()`` of the last request of the game.
+    """
+
+    def __init__(self, table_size: int = 1 << 16):
+        """
+        Initializes the Session class.
+
+        Args:
+          table_size:
+            Number of buckets of the transposition table.
+        """
+        self.table = TranspositionTable(table_size)
+        self.orderer = MoveOrderer()
+        self.pv = []
+        self.predicted_key = None
+        self.pv_hits = 0
+        self.ponderer = Ponderer()
+        self.tree = SearchTree()
+        self.last_used = time.monotonic()
+
+    def remember(self, board: Board, pv: typing.List[typing.Tuple[str, tuple]]):
+        """
+        Keeps the principal variation of a search and the position it predicts for the next turn.
+
+        Args:
+          board:
+            The board the search was run on; it is left unchanged.
+          pv:
+            The principal variation found by the search.
+        """
+        self.pv = pv
+        self.predicted_key = None
+        if pv:
+            my_move, opponent_moves = pv[0]
+            turn_moves = list(opponent_moves)
+            turn_moves[board.you] = my_move
+            board.make_move(turn_moves)
+            self.predicted_key = board.key
+            board.unmake_move()
+
+    @property
+    def memory(self) -> int:
+        """
+        Estimated memory used by the session, in bytes.
+        """
+        table = self.table
+        return (2 * table.size * TT_SLOT_BYTES + min(table.stores, 2 * table.size) * TT_ENTRY_BYTES
+                + self.tree.size * MCTS_NODE_BYTES)
+
+
+def session_key(game_state: typing.Dict) -> typing.Tuple[str, str]:
+    """
+    The key of the session of a game state: the game id and our snake's id, since two of our snakes may play
+    in the same game (e.g. in self-play) and must not share a transposition table.
+    """
+    return game_state.get("game", {}).get("id", ""), game_state.get("you", {}).get("id", "")
+
+
+class SessionStore:
+    """
+    Sessions of the games in progress, keyed by ``session_key``: one per game and snake of ours.
+
+    Sessions are dropped when their game ends, when they have been idle for too long, and least recently
+    used first when their estimated memory goes over the limit.
+
+    Attributes:
+      idle_timeout:
+        Seconds without a request after which a session is dropped.
+      memory_limit:
+        Estimated memory all sessions may use, in bytes.
+    """
+
+    def __init__(self, idle_timeout: float = SESSION_IDLE_TIMEOUT, memory_limit: float = SESSION_MEMORY_LIMIT_MB * 1024 * 1024):
+        """
+        Initializes the SessionStore class.
+
+        Args:
+          idle_timeout:
+            Seconds without a request after which a session is dropped.
+          memory_limit:
+            Estimated memory all sessions may use, in bytes.
+        """
+        self.idle_timeout = idle_timeout
+        self.memory_limit = memory_limit
+        self._sessions: typing.Dict[typing.Tuple[str, str], Session] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: typing.Tuple[str, str]) -> Session:
+        """
+        Gets the session of a game, creating it if the game has none yet.
+
+        Args:
+          key:
+            The ``session_key`` of the game state.
+
+        Returns:
+          The session of the game.
+        """
+        with self._lock:
+            now = time.monotonic()
+            session = self._sessions.pop(key, None)
+            if session is None:
+                session = Session()
+            session.last_used = now
+            # Reinsert so that the sessions stay ordered from least to most recently used
+            self._sessions[key] = session
+            self._evict(now)
+            return session
+
+    def end(self, key: typing.Tuple[str, str]) -> Session | None:
+        """
+        Drops the session of a game that is over.
+
+        Args:
+          key:
+            The ``session_key`` of the game state.
+
+        Returns:
+          The dropped session, or None if the game had none.
+        """
+        with self._lock:
+            return self._sessions.pop(key, None)
+
+    def _evict(self, now: float):
+        """
+        Drops idle sessions, then the least recently used ones while over the memory limit, stopping their
+        pondering. The most recently used session is always kept.
+
+        Args:
+          now:
+            The current ``time.monotonic()``.
+        """
+        sessions = self._sessions
+        for key in [key for key, session in sessions.items() if now - session.last_used > self.idle_timeout]:
+            sessions.pop(key).ponderer.stop()
+        memory = sum(session.memory for session in sessions.values())
+        while memory > self.memory_limit and len(sessions) > 1:
+            session = sessions.pop(next(iter(sessions)))
+            session.ponderer.stop()
+            memory -= session.memory
+
+    def __len__(self) -> int:
+        """
+        Number of sessions kept.
+        """
+        return len(self._sessions)
+
+    def __contains__(self, key: typing.Tuple[str, str]) -> bool:
+        """
+        Checks if a game has a session.
+        """
+        return key in self._sessions
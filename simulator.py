@@ -0,0 +1,185 @@
+"""
+Plays Battlesnake games between move engines in-process, without HTTP or the battlesnake CLI.
+
+  python simulator.py --games 100 --engines main simple [--processes 4] [--timeout 250]
+
+Engines are modules with a ``move(game_state)`` handler (and optionally ``start`` and ``end``), e.g. main and
+simple. Seats are assigned round robin and rotated between games. Games run in parallel across processes.
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import random
+import time
+import typing
+
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board
+from metrics import percentile
+
+# Standard rules: food spawns with this chance each turn, and always while there is less than the minimum
+FOOD_SPAWN_CHANCE = 0.15
+MINIMUM_FOOD = 1
+START_LENGTH = 3
+# Games still running after this many turns are draws
+MAX_TURNS = 500
+
+
+def start_positions(width: int, height: int) -> typing.List[typing.Tuple[int, int]]:
+    """
+    Start cells of the standard rules: corners first, then the middle of every edge, one cell from the walls.
+    """
+    middle_x, middle_y = width // 2, height // 2
+    return [(1, 1), (width - 2, height - 2), (1, height - 2), (width - 2, 1),
+            (middle_x, 1), (middle_x, height - 2), (1, middle_y), (width - 2, middle_y)]
+
+
+def new_game(game_id: str, engines: typing.List[str], width: int, height: int, timeout: int, rng: random.Random) -> Board:
+    """
+    Sets up a game: every snake starts stacked on a start cell with food next to it and one food in the middle.
+
+    Args:
+      game_id:
+        Id of the game.
+      engines:
+        Engine of every snake.
+      width:
+        Number of columns on the board.
+      height:
+        Number of rows on the board.
+      timeout:
+        Move timeout of the game, in ms.
+      rng:
+        Random generator of the game.
+
+    Returns:
+      The board of the first turn.
+    """
+    positions = start_positions(width, height)[:len(engines)]
+    rng.shuffle(positions)
+    snakes = []
+    food = [{'x': width // 2, 'y': height // 2}]
+    for slot, (engine, (x, y)) in enumerate(zip(engines, positions)):
+        snakes.append({'id': f'snake-{slot}', 'name': engine, 'health': 100, 'body': [{'x': x, 'y': y}] * START_LENGTH})
+        food.append({'x': x + (1 if x < width // 2 else -1), 'y': y + (1 if y < height // 2 else -1)})
+    game_state = {
+        'game': {'id': game_id, 'timeout': timeout, 'ruleset': {'name': 'standard'}},
+        'turn': 0,
+        'board': {'width': width, 'height': height, 'food': food, 'hazards': [], 'snakes': snakes},
+        'you': snakes[0],
+    }
+    return Board.from_game_state(game_state)
+
+
+def spawn_food(board: Board, rng: random.Random):
+    """
+    Places food on a random empty cell following the standard rules.
+    """
+    if len(board.food) >= MINIMUM_FOOD and rng.random() >= FOOD_SPAWN_CHANCE:
+        return
+    empty = [cell for cell in range(board.width * board.height) if not board.cells[cell] and cell not in board.food]
+    if empty:
+        board.food.add(rng.choice(empty))
+        board.rehash()
+
+
+def play_game(seed: int, engines: typing.List[str], width: int = 11, height: int = 11, timeout: int = 250) -> typing.Dict:
+    """
+    Plays one game to the end.
+
+    Args:
+      seed:
+        Seed of the game; it also rotates the seats.
+      engines:
+        Module name of the engine of every snake.
+      width:
+        Number of columns on the board.
+      height:
+        Number of rows on the board.
+      timeout:
+        Move timeout sent to the engines, in ms.
+
+    Returns:
+      The engine that won (None for a draw), the number of turns and the move times of every engine in ms.
+    """
+    rng = random.Random(seed)
+    seats = engines[seed % len(engines):] + engines[:seed % len(engines)]
+    modules = [importlib.import_module(engine) for engine in seats]
+    board = new_game(f'selfplay-{seed}', seats, width, height, timeout, rng)
+    times = {engine: [] for engine in engines}
+
+    def call(module, handler: str, game_state: typing.Dict):
+        function = getattr(module, handler, None)
+        if function is not None:
+            # Engines log every move; keep that out of the simulator output
+            with contextlib.redirect_stdout(io.StringIO()):
+                return function(game_state)
+
+    def state_of(slot: int) -> typing.Dict:
+        board.you = slot
+        return board.to_game_state()
+
+    for slot, module in enumerate(modules):
+        call(module, 'start', state_of(slot))
+
+    while board.turn < MAX_TURNS and sum(snake.alive for snake in board.snakes) > 1:
+        moves = [None] * len(board.snakes)
+        for slot, (snake, module) in enumerate(zip(board.snakes, modules)):
+            if not snake.alive:
+                continue
+            game_state = state_of(slot)
+            started = time.perf_counter()
+            moves[slot] = call(module, 'move', game_state)['move']
+            times[seats[slot]].append((time.perf_counter() - started) * 1000)
+        board.make_move(moves)
+        spawn_food(board, rng)
+
+    for slot, module in enumerate(modules):
+        call(module, 'end', state_of(slot))
+
+    alive = [seats[slot] for slot, snake in enumerate(board.snakes) if snake.alive]
+    return {'winner': alive[0] if len(alive) == 1 else None, 'turns': board.turn, 'times': times}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--engines', nargs='+', default=['main', 'simple'], help='engine module of every snake')
+    parser.add_argument('--processes', type=int, default=None, help='worker processes, one per core by default')
+    parser.add_argument('--width', type=int, default=11)
+    parser.add_argument('--height', type=int, default=11)
+    parser.add_argument('--timeout', type=int, default=250, help='move timeout sent to the engines, in ms')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    wins = {engine: 0 for engine in args.engines}
+    draws = 0
+    turns = 0
+    times = {engine: [] for engine in args.engines}
+    with ProcessPoolExecutor(max_workers=args.processes) as executor:
+        seeds = range(args.seed, args.seed + args.games)
+        for result in executor.map(play_game, seeds, [args.engines] * args.games, [args.width] * args.games,
+                                   [args.height] * args.games, [args.timeout] * args.games):
+            if result['winner'] is None:
+                draws += 1
+            else:
+                wins[result['winner']] += 1
+            turns += result['turns']
+            for engine, engine_times in result['times'].items():
+                times[engine] += engine_times
+
+    elapsed = time.perf_counter() - started
+    print(f"{args.games} games in {elapsed:.1f} s, {turns / args.games:.1f} turns per game, {draws} draws")
+    for engine in dict.fromkeys(args.engines):
+        engine_times = times[engine]
+        print(f"  {engine:<15} {wins[engine] / args.games:6.1%} wins  {len(engine_times)} moves  "
+              f"mean {sum(engine_times) / max(len(engine_times), 1):7.2f} ms  p50 {percentile(engine_times, 0.5):7.2f} ms  "
+              f"p99 {percentile(engine_times, 0.99):7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
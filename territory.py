@@ -0,0 +1,159 @@
+from board import Board
+
+
+# Owner of a cell that two or more snakes reach at the same time
+CONTESTED = -2
+# Owner of a cell that no snake reaches
+UNREACHED = -1
+
+
+# Translation of occupancy counts to the digits of a bitboard: '0' for a free cell, '1' for an occupied one
+_OCCUPIED_DIGITS = b'0' + b'1' * 255
+
+
+class Territory:
+    """
+    Result of a Voronoi partition of the board between the snakes.
+
+    The search keeps the cells won and contested in every distance layer as bitboards; ``owner`` and
+    ``distance`` are only built from them when read, since the evaluation just needs the counts.
+
+    Attributes:
+      owner:
+        Per cell, the index of the snake that reaches it first, CONTESTED or UNREACHED.
+        Snake segments are UNREACHED, except heads which belong to their snake.
+      distance:
+        Per cell, the number of moves needed by the snakes that reach it first, or -1.
+      counts:
+        Per snake index, the number of cells it reaches first.
+      food_distances:
+        Per snake index, the distance to the nearest food it reaches first (contested food included), or None.
+    """
+    __slots__ = ('counts', 'food_distances', '_size', '_layers', '_owner', '_distance')
+
+    def __init__(self, size: int, layers: list, counts: list, food_distances: list):
+        """
+        Initializes the Territory class.
+
+        Args:
+          size:
+            Number of cells on the board.
+          layers:
+            Per distance layer from 0 (the heads) on, the ``(snake index, bitboard)`` pairs of the cells won
+            and the bitboard of the contested cells.
+          counts:
+            Per snake index, the number of cells it reaches first.
+          food_distances:
+            Per snake index, the distance to the nearest food it reaches first, or None.
+        """
+        self.counts = counts
+        self.food_distances = food_distances
+        self._size = size
+        self._layers = layers
+        self._owner = None
+        self._distance = None
+
+    def _build(self):
+        """
+        Fills the per-cell owner and distance lists from the layers.
+        """
+        owner = [UNREACHED] * self._size
+        distance = [-1] * self._size
+        for layer, (won, contested) in enumerate(self._layers):
+            for index, bits in won + [(CONTESTED, contested)]:
+                while bits:
+                    lowest = bits & -bits
+                    cell = lowest.bit_length() - 1
+                    owner[cell] = index
+                    distance[cell] = layer
+                    bits ^= lowest
+        self._owner, self._distance = owner, distance
+
+    @property
+    def owner(self) -> list:
+        """
+        Per cell, the index of the snake that reaches it first, CONTESTED or UNREACHED.
+        """
+        if self._owner is None:
+            self._build()
+        return self._owner
+
+    @property
+    def distance(self) -> list:
+        """
+        Per cell, the number of moves needed by the snakes that reach it first, or -1.
+        """
+        if self._distance is None:
+            self._build()
+        return self._distance
+
+    @property
+    def contested(self) -> bytearray:
+        """
+        Per cell, 1 if two or more snakes reach it at the same time.
+        """
+        return bytearray(owner == CONTESTED for owner in self.owner)
+
+
+def voronoi(board: Board) -> Territory:
+    """
+    Computes which cells every snake reaches first with one multi-source breadth-first search from all heads.
+
+    Cells are expanded one distance layer at a time on bitboards (Python ints with bit ``i`` for cell ``i``),
+    so a whole layer of a snake is grown with a few shifts. A cell reached by several snakes in the same
+    layer is contested: it belongs to nobody and the search doesn't continue through it.
+
+    Args:
+      board:
+        The board representation of the game state.
+
+    Returns:
+      The territory of every snake, their distances to food and the contested cells.
+    """
+    tables = board.geometry
+    width = board.width
+    not_first_column = tables.not_first_column
+    not_last_column = tables.not_last_column
+    snakes = board.snakes
+
+    # The occupancy counts become the binary digits of the occupied bitboard, most significant cell first
+    free = tables.all_cells & ~int(board.cells.translate(_OCCUPIED_DIGITS)[::-1], 2)
+    food = 0
+    for cell in board.food:
+        food |= 1 << cell
+
+    counts = [0] * len(snakes)
+    food_distances = [None] * len(snakes)
+    frontiers = [(index, 1 << snake.body[0]) for index, snake in enumerate(snakes) if snake.alive]
+    layers = [(frontiers, 0)]
+    layer = 0
+    while frontiers:
+        layer += 1
+        reached = []
+        union = 0
+        contested = 0
+        for index, frontier in frontiers:
+            cells = (((frontier << 1) & not_first_column) | ((frontier >> 1) & not_last_column)
+                     | (frontier << width) | (frontier >> width)) & free
+            if cells:
+                # Reached by another snake in the same layer: nobody owns it
+                contested |= union & cells
+                union |= cells
+                reached.append((index, cells))
+        free &= ~union
+
+        frontiers = []
+        for index, cells in reached:
+            # Contested food counts for every snake that reaches it in that layer
+            if food & cells and food_distances[index] is None:
+                food_distances[index] = layer
+            if contested:
+                cells &= ~contested
+                if not cells:
+                    continue
+            counts[index] += cells.bit_count()
+            frontiers.append((index, cells))
+        if union:
+            layers.append((frontiers, contested))
+
+    return Territory(width * board.height, layers, counts, food_distances)
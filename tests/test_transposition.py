@@ -0,0 +1,33 @@
+from board import Board
+
+
+def game_state(snakes):
+    return {'game': {'id': 'game'}, 'turn': 0, 'you': snakes[0],
+            'board': {'width': 7, 'height': 7, 'food': [], 'hazards': [], 'snakes': snakes}}
+
+
+def snake(snake_id, body, health=90):
+    points = [{'x': x, 'y': y} for x, y in body]
+    return {'id': snake_id, 'name': snake_id, 'health': health, 'body': points, 'head': points[0], 'length': len(points)}
+
+
+def test_eliminated_snake_changes_the_key():
+    # The second snake starves on this move, so the search scores the position with the kill bonus
+    board = Board.from_game_state(game_state([snake('you', [(1, 1), (1, 0), (0, 0)]),
+                                              snake('other', [(5, 5), (5, 4), (5, 3)], health=1)]))
+    board.make_move(['up', 'up'])
+    assert not board.snakes[1].alive
+
+    # Next turn's board, where the snake is simply absent, is scored without it
+    cleared = Board.from_game_state(board.to_game_state())
+    assert len(cleared.snakes) == 1
+    assert cleared.key != board.key
+
+
+def test_rehash_matches_the_key_kept_by_make_move():
+    board = Board.from_game_state(game_state([snake('you', [(1, 1), (1, 0), (0, 0)]),
+                                              snake('other', [(5, 5), (5, 4), (5, 3)], health=1)]))
+    board.make_move(['up', 'up'])
+    key = board.key
+    board.rehash()
+    assert board.key == key
@@ -0,0 +1,240 @@
+import random
+import typing
+
+
+# Bound types stored with a value: exact score, fail-high (lower bound) or fail-low (upper bound)
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Fixed seed so that every process hashes the same position to the same key
+ZOBRIST_SEED = 0x5EED
+# Key mixed into the position key when the minimizing player is to move, together with the key of
+# the move the maximizing player has already chosen
+MINIMIZING_KEY = random.Random(ZOBRIST_SEED).getrandbits(64)
+MOVE_KEYS = {move: random.Random(ZOBRIST_SEED + i + 1).getrandbits(64)
+             for i, move in enumerate(('up', 'down', 'left', 'right', None))}
+
+
+class ZobristKeys:
+    """
+    Random 64-bit keys for every feature of a position on a board of a given size.
+
+    Attributes:
+      size:
+        Number of cells on the board.
+      segment:
+        Per snake slot, one key per cell for a body segment of that snake.
+      head:
+        Per snake slot, one key per cell for the head of that snake.
+      food:
+        One key per cell for a piece of food.
+      you:
+        Per snake slot, the key of the position being searched for that snake. The same position searched
+        for two of our snakes in one game is scored from different points of view, so it gets different keys.
+      eliminated:
+        Per snake slot, the key of that snake having been eliminated. A search position where a snake was
+        eliminated is scored with the kill bonus, so it must not share its key with the next turn's board,
+        where the snake is simply absent.
+    """
+    __slots__ = ('size', 'segment', 'head', 'food', 'you', 'eliminated')
+
+    def __init__(self, size: int):
+        """
+        Initializes the ZobristKeys class with the food keys.
+
+        Args:
+          size:
+            Number of cells on the board.
+        """
+        self.size = size
+        rng = random.Random(ZOBRIST_SEED * 1000003 + size)
+        self.food = [rng.getrandbits(64) for _ in range(size)]
+        self.segment = []
+        self.head = []
+        self.you = []
+        self.eliminated = []
+
+    def ensure_slots(self, slots: int):
+        """
+        Generates keys for additional snake slots on demand.
+
+        Args:
+          slots:
+            Number of snake slots that need keys.
+        """
+        while len(self.segment) < slots:
+            rng = random.Random((ZOBRIST_SEED * 1000003 + self.size) * 64 + len(self.segment))
+            self.segment.append([rng.getrandbits(64) for _ in range(self.size)])
+            self.head.append([rng.getrandbits(64) for _ in range(self.size)])
+            self.you.append(rng.getrandbits(64))
+            self.eliminated.append(rng.getrandbits(64))
+
+
+_zobrist_keys: typing.Dict[int, ZobristKeys] = {}
+
+
+def zobrist_keys(size: int, slots: int) -> ZobristKeys:
+    """
+    Gets the process-wide Zobrist keys for a board size.
+
+    Args:
+      size:
+        Number of cells on the board.
+      slots:
+        Number of snake slots that need keys.
+
+    Returns:
+      The keys for that board size.
+    """
+    keys = _zobrist_keys.get(size)
+    if keys is None:
+        keys = _zobrist_keys[size] = ZobristKeys(size)
+    keys.ensure_slots(slots)
+    return keys
+
+
+def hash_game_state(game_state: typing.Dict) -> int:
+    """
+    Computes the Zobrist key of a dict game state from scratch, matching the key kept by the board.
+
+    Our snake is read from ``you`` so that states produced by a dict-based ``apply_move`` hash correctly.
+
+    Args:
+      game_state:
+        Information about the state space of the game.
+
+    Returns:
+      The Zobrist key of the position.
+    """
+    width = game_state['board']['width']
+    snakes = game_state['board']['snakes']
+    you = game_state['you']
+    keys = zobrist_keys(width * game_state['board']['height'], len(snakes) + 1)
+
+    key = 0
+    for food in game_state['board']['food']:
+        key ^= keys.food[food['y'] * width + food['x']]
+    for slot, snake in enumerate(snakes):
+        if snake['id'] == you['id']:
+            snake = you
+            key ^= keys.you[slot]
+        body = snake['body']
+        key ^= keys.head[slot][body[0]['y'] * width + body[0]['x']]
+        segment = keys.segment[slot]
+        for part in body:
+            key ^= segment[part['y'] * width + part['x']]
+    return key
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results keyed by Zobrist key.
+
+    Every bucket holds two entries: a depth-preferred one that is only replaced by a search at least as
+    deep (or by any search once the entry is from an older generation) and an always-replace one.
+    Entries are tuples ``(key, depth, value, bound, move, generation)``.
+
+    Attributes:
+      size:
+        Number of buckets, a power of two.
+      generation:
+        Counter bumped by new_search so stale deep entries can be replaced.
+      hits:
+        Number of probes that found the position.
+      misses:
+        Number of probes that did not.
+      stores:
+        Number of entries written.
+    """
+
+    def __init__(self, size: int = 1 << 16):
+        """
+        Initializes the TranspositionTable class.
+
+        Args:
+          size:
+            Number of buckets, rounded up to a power of two. Memory use is bounded by two entries per bucket.
+        """
+        self.size = 1 << max(size - 1, 0).bit_length()
+        self._mask = self.size - 1
+        self._deep = [None] * self.size
+        self._recent = [None] * self.size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def new_search(self):
+        """
+        Marks the start of a new search so entries from earlier ones become replaceable.
+        """
+        self.generation += 1
+
+    def clear(self):
+        """
+        Removes every entry and resets the counters.
+        """
+        self._deep = [None] * self.size
+        self._recent = [None] * self.size
+        self.hits = self.misses = self.stores = 0
+
+    def probe(self, key: int) -> tuple | None:
+        """
+        Looks up a position.
+
+        Args:
+          key:
+            The Zobrist key of the position.
+
+        Returns:
+          The ``(key, depth, value, bound, move, generation)`` entry, or None if the position isn't stored.
+        """
+        index = key & self._mask
+        entry = self._deep[index]
+        if entry is None or entry[0] != key:
+            entry = self._recent[index]
+            if entry is None or entry[0] != key:
+                self.misses += 1
+                return None
+        self.hits += 1
+        return entry
+
+    def store(self, key: int, depth: int, value: float, bound: int, move: str | None):
+        """
+        Stores a search result.
+
+        Args:
+          key:
+            The Zobrist key of the position.
+          depth:
+            The remaining depth the position was searched to.
+          value:
+            The value found.
+          bound:
+            EXACT, LOWER_BOUND or UPPER_BOUND.
+          move:
+            The best move found, if any.
+        """
+        index = key & self._mask
+        entry = (key, depth, value, bound, move, self.generation)
+        deep = self._deep[index]
+        if deep is None or depth >= deep[1] or deep[5] != self.generation:
+            self._deep[index] = entry
+        else:
+            self._recent[index] = entry
+        self.stores += 1
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Fraction of probes that found the position.
+        """
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+    def __len__(self) -> int:
+        """
+        Number of stored entries.
+        """
+        return sum(entry is not None for entry in self._deep) + sum(entry is not None for entry in self._recent)